@@ -1,95 +1,103 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from base_scraper import BaseScraper
+from page_snapshot import PageSnapshot
+from page_waits import BotWallError, Outcomes
+from product_key import product_key, storage_key
 from typing import Dict, Optional, Tuple
 import re
-import time
 import traceback
 
+COLOR_PATTERN = re.compile(r'\(([\w\s]+)\)')
+
 class AmazonScraper(BaseScraper):
-   def extract_product_info(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+   platform = "Amazon"
+
+   # The size twister switches variants in place
+   supports_variants = True
+
+   # Search result cards show title, price and stock for a whole model range
+   search_url = "https://www.amazon.in/s?k={query}"
+
+   def page_outcomes(self) -> Outcomes:
+       """The bot check outcome is added by wait_for_outcome"""
+       return {
+           "product": ([self.selector_group("title")], None),
+       }
+
+   def extract_product_info(self, url: str, page: PageSnapshot) -> Tuple[Optional[str], Optional[str], Optional[str]]:
        """
        Extract product name, storage variant, and color from the Amazon product page
        """
        try:
-           time.sleep(2)
-           title_element = WebDriverWait(self.driver, 10).until(
-               EC.presence_of_element_located((By.CSS_SELECTOR, "span#productTitle"))
-           )
-           print("Product title element found")
-           
-           if not title_element:
+           full_title = self.find_text(page, "title")
+           if not full_title:
                print("Could not find product title")
                return None, None, None
-               
-           full_title = title_element.text.strip()
+
            print(f"Extracted title: {full_title}")
-           
-           if "iPhone" in full_title:
-               model_match = re.search(r'iPhone\s+(\d+(?:\s+(?:Pro|Plus|mini|Pro Max))?)', full_title)
-               if model_match:
-                   product_name = model_match.group(0)
-                   
-                   storage_match = re.search(r'(\d+)\s*(TB|GB)', full_title, re.IGNORECASE)
-                   if storage_match:
-                       storage_size = storage_match.group(1)
-                       storage_unit = storage_match.group(2).upper()
-                       storage = f"{storage_size}{storage_unit}"
-                   else:
-                       storage = None
-                   
-                   color_match = re.search(r'\(([\w\s]+)\)', full_title)
-                   color = color_match.group(1) if color_match else None
-                   
-                   print(f"Extracted iPhone info - Model: {product_name}, Storage: {storage}, Color: {color}")
-                   return product_name, storage, color
-
-           storage_match = re.search(r'(\d+)\s*(TB|GB)', full_title, re.IGNORECASE)
-           if storage_match:
-               storage_size = storage_match.group(1)
-               storage_unit = storage_match.group(2).upper()
-               storage = f"{storage_size}{storage_unit}"
-           else:
-               storage = None
-           
-           color_match = re.search(r'\(([\w\s]+)\)', full_title)
-           color = color_match.group(1) if color_match else None
-           
-           product_name = re.sub(r'\(.*?\)', '', full_title).strip()
-           print(f"Extracted generic product info - Name: {product_name}, Storage: {storage}, Color: {color}")
-           return product_name, storage, color
+           return self.parse_title(full_title)
                
        except Exception as e:
            print(f"Error extracting product info: {str(e)}")
            traceback.print_exc()
            return None, None, None
 
-   def _check_out_of_stock(self) -> bool:
-       """Check if the product is out of stock using various indicators"""
-       out_of_stock_selectors = [
-           '#availability .a-color-price',
-           '#outOfStock',
-           '.a-color-price.a-text-bold',
-           '.a-size-medium.a-color-price',
-           '#availability span'
-       ]
+   def parse_title(self, full_title: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+       """
+       Split an Amazon product title into product name, storage variant, and color
+
+       Product pages and search result cards carry the same title.
+       """
+       key = product_key(full_title)
+       if key:
+           color_match = COLOR_PATTERN.search(full_title)
+           color = color_match.group(1) if color_match else None
+           
+           print(f"Extracted iPhone info - Model: {key.name}, Storage: {key.storage}, Color: {color}")
+           return key.name, key.storage, color
+
+       storage = storage_key(full_title)
        
-       try:
-           for selector in out_of_stock_selectors:
-               elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-               for element in elements:
-                   text = element.text.lower()
-                   if any(phrase in text for phrase in [
-                       'currently unavailable',
-                       'out of stock',
-                       'not available',
-                       'discontinued'
-                   ]):
-                       return True
-           return False
-       except Exception:
-           return False
+       color_match = COLOR_PATTERN.search(full_title)
+       color = color_match.group(1) if color_match else None
+       
+       product_name = re.sub(r'\(.*?\)', '', full_title).strip()
+       print(f"Extracted generic product info - Name: {product_name}, Storage: {storage}, Color: {color}")
+       return product_name, storage, color
+
+   def _check_out_of_stock(self, page: PageSnapshot) -> bool:
+       """Check if the product is out of stock using various indicators"""
+       def is_out_of_stock(text: str) -> bool:
+           text = text.lower()
+           return any(phrase in text for phrase in [
+               'currently unavailable',
+               'out of stock',
+               'not available',
+               'discontinued'
+           ])
+
+       return self.find_text(page, "out_of_stock", accept=is_out_of_stock) is not None
+
+   @staticmethod
+   def _clean_price(price_text: str) -> str:
+       return price_text.replace(",", "").replace("₹", "").strip()
+
+   def extract_price(self, page: PageSnapshot) -> Optional[str]:
+       """
+       Return the price in rupees, "Out of stock", or None if nothing was found
+       """
+       price_text = self.find_text(
+           page, "price",
+           accept=lambda text: '₹' in text and self._clean_price(text).isdigit()
+       )
+       if price_text:
+           price = self._clean_price(price_text)
+           print(f"Found price: {price}")
+           return price
+
+       print("No price found, checking if out of stock...")
+       if self._check_out_of_stock(page):
+           return "Out of stock"
+       return None
 
    def fetch_price(self, url: str) -> str:
        """
@@ -97,19 +105,18 @@ class AmazonScraper(BaseScraper):
        """
        try:
            print(f"\nProcessing URL: {url}")
-           self.driver.get(url)
+           self.load_page(url)
            print("Successfully loaded page")
            
-           try:
-               WebDriverWait(self.driver, 10).until(
-                   EC.presence_of_element_located((By.CSS_SELECTOR, "span#productTitle"))
-               )
-               print("Page fully loaded")
-           except Exception as e:
-               print(f"Error waiting for page load: {str(e)}")
+           outcome = self.wait_for_outcome(self.page_outcomes())
+           if outcome is None:
+               print("Error waiting for page load")
                return "Error: Page load timeout"
+           print("Page fully loaded")
+
+           page = self.snapshot(url)
 
-           product_name, storage, color = self.extract_product_info(url)
+           product_name, storage, color = self.extract_product_info(url, page)
            if not product_name:
                print("Failed to extract product info")
                return "Error: Could not extract product info"
@@ -117,48 +124,21 @@ class AmazonScraper(BaseScraper):
            full_name = f"{product_name} ({storage})" if storage else product_name
            print(f"Processing product: {full_name}")
 
-           # Updated price selectors
-           price_selectors = [
-               '.a-price[data-a-color="price"] .a-offscreen',
-               '.a-price .a-offscreen',
-               '.a-price[data-a-color="base"] .a-offscreen',
-               'span[data-a-color="price"] .a-offscreen',
-               '#priceblock_ourprice',
-               '.a-size-medium.a-color-price'
-           ]
-           
-           print("Attempting to find price...")
-           for selector in price_selectors:
-               try:
-                   print(f"Trying selector: {selector}")
-                   price_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                   
-                   for price_tag in price_elements:
-                       price_text = price_tag.get_attribute('textContent').strip()
-                       print(f"Found price text: {price_text}")
-                       
-                       if price_text and '₹' in price_text:
-                           price = price_text.replace(",", "").replace("₹", "").strip()
-                           print(f"Cleaned price: {price}")
-                           
-                           if price.isdigit():
-                               self.save_to_sheets(full_name, price, "Amazon")
-                               print(f"✓ Successfully saved: {full_name} - ₹{price}")
-                               return price
-               except Exception as e:
-                   print(f"Selector {selector} failed: {str(e)}")
-                   continue
-
-           print("No price found, checking if out of stock...")
-           if self._check_out_of_stock():
-               self.save_to_sheets(full_name, "Out of stock", "Amazon")
-               print(f"✓ {full_name}: Out of stock")
-               return "Out of stock"
+           price = self.extract_price(page)
+           if price and price != "Out of stock":
+               self.save_to_sheets(full_name, price, "Amazon")
+               print(f"✓ Successfully saved: {full_name} - ₹{price}")
+               return price
 
            self.save_to_sheets(full_name, "Out of stock", "Amazon")
-           print(f"✓ {full_name}: Out of stock (No price found)")
+           if price:
+               print(f"✓ {full_name}: Out of stock")
+           else:
+               print(f"✓ {full_name}: Out of stock (No price found)")
            return "Out of stock"
 
+       except BotWallError:
+           raise
        except Exception as e:
            print(f"Error in fetch_price: {str(e)}")
            traceback.print_exc()
@@ -1,110 +1,341 @@
-import os
+import time
 from datetime import datetime
-from typing import Dict, Optional, Union
-import re
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 from googleapiclient.errors import HttpError
-
-# If modifying these scopes, delete the file token.json.
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+from browser_profile import apply_platform_blocking
+from page_snapshot import PageSnapshot
+from page_waits import BOT_WALL, BotWallError, Outcomes, get_latency_stats, wait_for_first
+from selector_registry import get_selector_registry
+from sheets_session import SPREADSHEET_ID, get_sheets_session
+from sheets_writer import LONG_HEADER, LONG_LAYOUT, WIDE_LAYOUT, SheetsWriter, iter_sheet_rows
+from price_store import DEFAULT_STORE_PATH, PriceStore
+from price_cache import get_price_cache
+from page_archive import LISTING_PAGE, PRODUCT_PAGE, get_page_archive
+from observation_queue import DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_PATH, ObservationQueue, QueueFlusher
+from product_key import ProductKey, canonical_name, product_key, storage_key
+from variants import VARIANT_CLICK_SCRIPT, split_variant
+from listings import is_excluded
+from http_fetch import clean_price
 
 class BaseScraper:
-    def __init__(self, driver):
+    # Platform name used for sheets, latency stats and logging
+    platform = "base"
+
+    # Set by platforms whose product pages carry the price in server-rendered markup
+    http_fast_path = False
+
+    # Set by platforms whose product page can switch between storage variants
+    supports_variants = False
+
+    # Seconds to wait for a clicked variant to replace the one shown
+    variant_switch_timeout = 5.0
+
+    # Search results URL with a {query} placeholder, for platforms whose result cards show prices
+    search_url: Optional[str] = None
+
+    def __init__(self, driver, flush_every: Optional[int] = None, queue_path: str = DEFAULT_QUEUE_PATH,
+                 store_path: str = DEFAULT_STORE_PATH, sheet_layout: str = WIDE_LAYOUT,
+                 sync_sheets: bool = True, archive_path: Optional[str] = None,
+                 store: Optional[PriceStore] = None, queue: Optional[ObservationQueue] = None):
         self.driver = driver
-        self.spreadsheet_id = "1dIIM6lmDfX0HhK5L5TFWnThr3TWzBAJ1kmP30632_9k"  # Your shared spreadsheet ID
+        self.spreadsheet_id = SPREADSHEET_ID
         self.sheet_id = "0"  # The gid from your URL
-        self.sheets_service = self._initialize_sheets_service()
-
-    def _initialize_sheets_service(self):
-        """Initialize and return Google Sheets service"""
-        creds = None
-        if os.path.exists("token.json"):
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    "credentials.json", SCOPES
-                )
-                creds = flow.run_local_server(port=8080)
-            with open("token.json", "w") as token:
-                token.write(creds.to_json())
+        # Shared across scrapers; credentials and the service are loaded on first use
+        self.session = get_sheets_session(self.spreadsheet_id)
+        self.sheet_layout = sheet_layout
+        # Shard nodes only write the local store; a merge run updates the sheet
+        self.sync_sheets = sync_sheets
+        self.writer = SheetsWriter(
+            self.session,
+            format_product_name=self.format_product_name,
+            layout=sheet_layout
+        )
+        # Workers pass in the store and queue of the scraper that owns the flusher;
+        # otherwise this scraper opens its own and closes them in close()
+        self.owns_store = store is None
+        self.store = PriceStore(store_path) if store is None else store
+        # Last known prices, shared by every scraper; only changes are queued for the sheet
+        self.price_cache = get_price_cache()
+        self.owns_queue = queue is None
+        self.queue = ObservationQueue(queue_path) if queue is None else queue
+        self.flusher = QueueFlusher(self.queue, self.writer, batch_size=flush_every or DEFAULT_BATCH_SIZE)
+        self.selectors = get_selector_registry()
+        # Product name of the last price saved; links config keys to stored history
+        self.last_saved: Optional[str] = None
+        # Every snapshot is captured here when recording pages for offline replay
+        self.archive = get_page_archive(archive_path) if archive_path else None
+        self.load_started = time.perf_counter()
 
-        try:
-            service = build("sheets", "v4", credentials=creds)
-            return service.spreadsheets()
-        except HttpError as error:
-            print(f"An error occurred: {error}")
-            return None
+    @property
+    def sheets_service(self):
+        """Google Sheets spreadsheets() resource of the shared session"""
+        return self.session.spreadsheets
 
     def format_product_name(self, product: str) -> str:
-        """Format product name to maintain consistency"""
-        try:
-            # Remove any URL query parameters if present
-            product = product.split('?')[0]
-            
-            # Remove any variant information from URL
-            product = product.split('variant=')[0]
-            
-            # Clean up the name
-            product = product.strip()
-            
-            # Fix iPhone capitalization
-            product = product.replace('Iphone', 'iPhone')
-            product = product.replace('iphone', 'iPhone')
-            
-            # Fix XR capitalization
-            product = product.replace('Xr', 'XR')
-            
-            # Format storage information if present
-            storage_match = re.search(r'\((\d+\s*(?:GB|TB))\)', product, re.IGNORECASE)
-            if storage_match:
-                storage = storage_match.group(1).upper().replace(' ', '')
-                # Remove the old storage format and add the standardized one
-                product = re.sub(r'\s*\(\d+\s*(?:GB|TB)\)', '', product, flags=re.IGNORECASE)
-                product = f"{product} ({storage})"
-            
-            # Ensure "Apple" prefix is present and properly formatted
-            if not product.startswith('Apple'):
-                product = f"Apple {product}"
-            
-            # Remove any double spaces
-            product = ' '.join(product.split())
-            
-            return product
-            
-        except Exception as e:
-            print(f"Error formatting product name: {e}")
-            return product
+        """
+        Format product name to maintain consistency
+
+        Delegates to product_key.canonical_name, which is memoised: every
+        sheet row and every save reuses earlier results.
+        """
+        return canonical_name(product)
+
+    def load_page(self, url: str) -> None:
+        """Navigate to a URL with this platform's resource blocking rules"""
+        apply_platform_blocking(self.driver, self.platform)
+        self.load_started = time.perf_counter()
+        self.driver.get(url)
+
+    def snapshot(self, url: str = "", kind: str = PRODUCT_PAGE) -> PageSnapshot:
+        """
+        Fetch the rendered page from the browser in one call and parse it locally
+
+        This is the only round-trip to the browser while reading a page; every
+        selector lookup on the snapshot afterwards runs in-process.
+        """
+        page = PageSnapshot.from_driver(self.driver, url)
+        if self.archive:
+            self.archive.record(self.platform, kind, url, self.driver.current_url, page.html,
+                                time.perf_counter() - self.load_started)
+        return page
+
+    def find_text(self, page: PageSnapshot, role: str,
+                  accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Return the first accepted text for a selector role, trying selectors in declared order, dead ones last
+
+        Args:
+            page (PageSnapshot): Snapshot of the product page
+            role (str): Selector role in selectors.json, e.g. "title" or "price"
+            accept (Optional[Callable[[str], bool]]): Only accept texts for which this returns True
+
+        Returns:
+            Optional[str]: Matching text, or None if no selector matched
+        """
+        for selector in self.selectors.ordered(self.platform, role):
+            start = time.perf_counter()
+            match = next((text for text in page.texts(selector) if accept is None or accept(text)), None)
+            self.selectors.record(self.platform, role, selector, match is not None, time.perf_counter() - start)
+            if match is not None:
+                return match
+        return None
+
+    def selector_group(self, role: str) -> str:
+        """Return all selectors of a role as one CSS selector, for in-browser waits"""
+        return self.selectors.group(self.platform, role)
+
+    def wait_for_outcome(self, outcomes: Outcomes, default_timeout: float = 10.0,
+                         record: bool = True) -> Optional[str]:
+        """
+        Wait until the first of several page outcomes appears and the DOM has settled
+
+        The timeout adapts to the platform's recorded latencies, and every wait
+        is recorded for future runs; a timeout counts as a load of the full
+        timeout, so pages slower than the current timeout raise it. The
+        platform's bot check selectors are raced along with the given
+        outcomes, so a CAPTCHA page is recognised as soon as it renders
+        instead of after the timeout.
+
+        Args:
+            outcomes (Outcomes): Outcome name -> (selector groups, optional text in the last group)
+            default_timeout (float): Timeout while the platform has too few recorded latencies
+            record (bool): Record the wait's duration; only the first wait after
+                loading a product page measures a product page load
+
+        Returns:
+            Optional[str]: Name of the outcome that appeared, or None on timeout
+
+        Raises:
+            BotWallError: The site served a bot check page
+        """
+        if BOT_WALL not in outcomes and self.selectors.ordered(self.platform, BOT_WALL):
+            outcomes = {**outcomes, BOT_WALL: ([self.selector_group(BOT_WALL)], None)}
+
+        stats = get_latency_stats()
+        timeout = stats.timeout_for(self.platform, default_timeout)
+        outcome, elapsed = wait_for_first(self.driver, outcomes, timeout)
+        if outcome is None:
+            print(f"Page not ready after {timeout:.1f}s")
+            if record:
+                stats.record(self.platform, timeout)
+            return None
+        if outcome == BOT_WALL:
+            # Bot checks render quickly; keep them out of the page latencies
+            raise BotWallError(self.platform, self.driver.current_url)
+        if record:
+            stats.record(self.platform, elapsed)
+        return outcome
+
+    def extract_fast(self, url: str) -> Optional[Tuple[str, str]]:
+        """
+        Price a product from a plain HTTP response, without the browser
+
+        Returns:
+            Optional[Tuple[str, str]]: (full product name, price), or None to fall back to Selenium
+        """
+        return None
+
+    def fetch_price_fast(self, url: str) -> Optional[str]:
+        """Try the HTTP fast path and save the price if it worked"""
+        # While recording, every page goes through the browser so it is captured
+        if not self.http_fast_path or self.archive:
+            return None
+
+        result = self.extract_fast(url)
+        if not result:
+            return None
+
+        full_product_name, price = result
+        self.save_to_sheets(full_product_name, price, self.platform)
+        print(f"✓ Scraped without browser: {full_product_name} - {price}")
+        return price
 
     def fetch_price(self, url: str) -> Optional[str]:
         """Base method for fetching price from a URL"""
         raise NotImplementedError("Subclasses must implement the fetch_price method")
 
-    def load_existing_data(self) -> Dict[str, Dict[str, str]]:
-        """Load existing data from Google Sheet"""
+    def scrape(self, source: str, url: str) -> Optional[str]:
+        """
+        Fetch the price of a configured product and link it to the saved product name
+
+        Args:
+            source (str): Product name as configured in platform_urls.json
+            url (str): Product URL
+
+        Returns:
+            Optional[str]: What fetch_price returned
+        """
+        self.last_saved = None
+        price = self.fetch_price(url)
+        if self.last_saved:
+            self.store.link_source(self.platform, source, self.last_saved)
+        return price
+
+    def read_page(self, url: str, page: PageSnapshot) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Read the variant a product page currently shows
+
+        Returns:
+            Optional[Tuple[str, Optional[str], Optional[str]]]: (full product name, storage key, price),
+                or None if the product could not be identified
+        """
+        product_name, storage, color = self.extract_product_info(url, page)
+        if not product_name:
+            return None
+        full_product_name = f"{product_name} ({storage})" if storage else product_name
+        return full_product_name, storage_key(storage), self.extract_price(page)
+
+    def fetch_variants(self, url: str, wanted: Set[Optional[str]]) -> Dict[Optional[str], Tuple[str, str]]:
+        """
+        Read the prices of several storage variants from one product page
+
+        The page is loaded once. Every other wanted variant is selected by
+        clicking its entry among the "variant_option" selectors and read once
+        the page shows it. The variant the page opened with is also returned
+        under the key None.
+
+        Args:
+            url (str): Product URL of any variant of the model
+            wanted (Set[Optional[str]]): Storage keys to read, e.g. {"128GB", "256GB"}
+
+        Returns:
+            Dict[Optional[str], Tuple[str, str]]: Storage key -> (full product name, price)
+        """
+        found: Dict[Optional[str], Tuple[str, str]] = {}
+        self.load_page(url)
+        self.wait_for_outcome(self.page_outcomes())
+        shown = self._read_variant(url, found)
+        if shown in found:
+            found[None] = found[shown]
+
+        options = self.selector_group("variant_option")
+        for storage in wanted:
+            if storage is None or storage in found or not options:
+                continue
+            if not self.driver.execute_script(VARIANT_CLICK_SCRIPT, options, storage):
+                print(f"No {storage} option on the {self.platform} page")
+                continue
+
+            deadline = time.monotonic() + self.variant_switch_timeout
+            while True:
+                self.wait_for_outcome(self.page_outcomes(), record=False)
+                if self._read_variant(self.driver.current_url, found) == storage or time.monotonic() > deadline:
+                    break
+                time.sleep(0.25)
+        return found
+
+    def _read_variant(self, url: str, found: Dict[Optional[str], Tuple[str, str]]) -> Optional[str]:
+        """Snapshot the page, add the variant it shows to ``found`` and return its storage key"""
+        result = self.read_page(url, self.snapshot(url))
+        if not result:
+            return None
+        full_product_name, storage, price = result
+        if storage and price:
+            found[storage] = (full_product_name, price)
+        return storage
+
+    def scrape_variants(self, members: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Scrape every configured variant of one model family from a single page load
+
+        Args:
+            members (List[Tuple[str, str]]): (configured product name, URL) of each variant;
+                the first URL is loaded
+
+        Returns:
+            Dict[str, str]: Price per configured product name, for the variants found
+        """
+        wanted = {source: split_variant(source)[1] for source, url in members}
+        prices = {}
+        try:
+            variants = self.fetch_variants(members[0][1], set(wanted.values()))
+        except BotWallError:
+            raise
+        except Exception as e:
+            print(f"Error reading {self.platform} variants: {e}")
+            return prices
+
+        for source, storage in wanted.items():
+            if storage not in variants:
+                continue
+            full_product_name, price = variants[storage]
+            self.save_to_sheets(full_product_name, price, self.platform)
+            self.store.link_source(self.platform, source, self.last_saved)
+            prices[source] = price
+        return prices
+
+    def sheet_name_for(self, platform: str) -> str:
+        """Return the sheet that holds a platform's prices in the configured layout"""
+        suffix = "history" if self.sheet_layout == LONG_LAYOUT else "prices"
+        return f"{platform.lower()}_{suffix}"
+
+    def load_existing_data(self, sheet_name: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """Load existing data from Google Sheet, reading it in bounded pages"""
         existing_data = {}
         try:
-            # Get all values from the sheet
-            result = self.sheets_service.values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range="A1:ZZ1000"
-            ).execute()
-            
-            values = result.get('values', [])
-            if not values:
+            rows = iter_sheet_rows(
+                self.sheets_service,
+                self.spreadsheet_id,
+                sheet_name,
+                throttle=self.session.throttle
+            )
+
+            # First row contains headers (Product and dates, or Date/Product/Price)
+            headers = next(rows, None)
+            if not headers:
+                return existing_data
+
+            if headers[:3] == LONG_HEADER:
+                for row in rows:
+                    if len(row) >= 3:
+                        product_name = self.format_product_name(row[1])
+                        existing_data.setdefault(product_name, {})[row[0]] = row[2]
                 return existing_data
 
-            # First row contains headers (Product and dates)
-            headers = values[0]
-            
             # Process each row
-            for row in values[1:]:
+            for row in rows:
+                if not row:
+                    continue
                 product_name = self.format_product_name(row[0])
                 if product_name not in existing_data:
                     existing_data[product_name] = {}
@@ -120,111 +351,147 @@ class BaseScraper:
             print(f"Error loading data from Google Sheets: {error}")
             return existing_data
 
-    def _ensure_sheet_exists(self, sheet_name: str) -> None:
-        """Ensure the sheet exists, create if it doesn't"""
+    def parse_title(self, full_title: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Split a product title into (product_name, storage_variant, color)"""
+        raise NotImplementedError("Platforms with a search_url must implement parse_title")
+
+    def read_listing(self, page: PageSnapshot) -> List[Tuple[str, str]]:
+        """
+        Read the result cards of a search page
+
+        Returns:
+            List[Tuple[str, str]]: (title, price) of every card that shows a price
+        """
+        cards = []
+        for card in page.sections(self.selector_group("listing_card")):
+            title = self.find_text(card, "listing_title")
+            price_text = self.find_text(card, "listing_price", accept=lambda text: '₹' in text)
+            price = clean_price(price_text) if price_text else None
+            if title and price:
+                cards.append((title, price))
+        return cards
+
+    def harvest_listing(self, url: str, members: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Price configured products from one search results page
+
+        Result cards are matched to configured products by their ProductKey.
+        Renewed and used listings are ignored. A product whose cards show
+        different prices is ambiguous, since the configured URL may be a
+        particular color, and is left for its own product page.
+
+        Args:
+            url (str): Search results URL
+            members (List[Tuple[str, str]]): (configured product name, product URL) the search should cover
+
+        Returns:
+            Dict[str, str]: Price per configured product name, for the products matched
+        """
+        prices = {}
         try:
-            # Get spreadsheet metadata
-            spreadsheet = self.sheets_service.get(spreadsheetId=self.spreadsheet_id).execute()
-            
-            # Check if sheet exists
-            sheet_exists = any(sheet['properties']['title'] == sheet_name 
-                             for sheet in spreadsheet['sheets'])
-            
-            if not sheet_exists:
-                # Create new sheet request
-                request = {
-                    'addSheet': {
-                        'properties': {
-                            'title': sheet_name
-                        }
-                    }
-                }
-                
-                body = {'requests': [request]}
-                response = self.sheets_service.batchUpdate(
-                    spreadsheetId=self.spreadsheet_id,
-                    body=body
-                ).execute()
-                print(f"Created new sheet: {sheet_name}")
-                
-        except HttpError as error:
-            print(f"Error ensuring sheet exists: {error}")
+            self.load_page(url)
+            listing = {"results": ([self.selector_group("listing_card")], None)}
+            if self.wait_for_outcome(listing, record=False) is None:
+                return prices
+            cards = self.read_listing(self.snapshot(url, LISTING_PAGE))
+        except BotWallError:
+            raise
+        except Exception as e:
+            print(f"Error reading {self.platform} search results: {e}")
+            return prices
+
+        # product key -> price -> first title shown at that price
+        offers: Dict[ProductKey, Dict[str, str]] = {}
+        for title, price in cards:
+            key = product_key(title)
+            if key and key.storage and not is_excluded(title):
+                offers.setdefault(key, {}).setdefault(price, title)
+        print(f"Read {len(cards)} result cards, {len(offers)} products")
+
+        for source, product_url in members:
+            matches = offers.get(product_key(source))
+            if not matches:
+                continue
+            if len(matches) > 1:
+                print(f"Ambiguous search results for {source}: {', '.join(sorted(matches))}")
+                continue
+            price, title = next(iter(matches.items()))
+            product_name, storage, color = self.parse_title(title)
+            if not product_name:
+                continue
+            full_product_name = f"{product_name} ({storage})" if storage else product_name
+            self.save_to_sheets(full_product_name, price, self.platform)
+            self.store.link_source(self.platform, source, self.last_saved)
+            prices[source] = price
+        return prices
 
     def save_to_sheets(self, product: str, price: Union[str, int, float], platform: str) -> None:
-        """Save or update product price in Google Sheet"""
-        try:
-            # Format the product name
-            formatted_product = self.format_product_name(product)
-            
-            # Use platform name as sheet name
-            sheet_name = f"{platform.lower()}_prices"
-            
-            # Ensure the sheet exists
-            self._ensure_sheet_exists(sheet_name)
-            
-            # Get today's date
-            today = datetime.now().strftime("%Y-%m-%d")
-            
-            try:
-                # Get existing data from the sheet
-                result = self.sheets_service.values().get(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=f"{sheet_name}!A1:ZZ1000"
-                ).execute()
-                
-                existing_data = {}
-                values = result.get('values', [])
-                existing_headers = values[0] if values else ["Product"]
-                
-                # Process existing data
-                for row in values[1:]:
-                    product_name = self.format_product_name(row[0])
-                    existing_data[product_name] = {}
-                    for i, price_val in enumerate(row[1:], 1):
-                        if i < len(existing_headers):
-                            existing_data[product_name][existing_headers[i]] = price_val
-                
-            except HttpError:
-                existing_data = {}
-                existing_headers = ["Product"]
-            
-            # Add or update the new price
-            if formatted_product not in existing_data:
-                existing_data[formatted_product] = {}
-            existing_data[formatted_product][today] = str(price)
-            
-            # Get all unique dates including today
-            all_dates = sorted(set(
-                date 
-                for product_data in existing_data.values() 
-                for date in product_data.keys()
-            ) | {today})
-            
-            # Prepare header and data
-            headers = ["Product"] + all_dates
-            rows = [headers]
-            
-            # Add data rows
-            for product_name, prices in existing_data.items():
-                row = [product_name]
-                for date in all_dates:
-                    row.append(prices.get(date, ""))
-                rows.append(row)
-            
-            # Update the sheet
-            sheet_range = f"{sheet_name}!A1"
-            self.sheets_service.values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=sheet_range,
-                valueInputOption="RAW",
-                body={"values": rows}
-            ).execute()
-            
-            print(f"✓ Updated price for {formatted_product} in {sheet_name}")
-            
-        except HttpError as error:
-            print(f"✗ Error saving data for {product}: {error}")
+        """
+        Record product price in the local store and queue it for Google Sheet if it changed
+
+        The local store keeps every day's price. Prices equal to the last
+        known one are not queued for the sheet; --export-sheet regenerates
+        the full daily grid from the store.
+        """
+        # Format the product name
+        formatted_product = self.format_product_name(product)
+
+        # Use platform name as sheet name
+        sheet_name = self.sheet_name_for(platform)
+
+        # Get today's date
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        # The local store is the system of record; the sheet is an export
+        self.store.add(platform, formatted_product, today, str(price))
+        self.last_saved = formatted_product
+        if self.price_cache.observe(platform, formatted_product, str(price)) is None:
+            print(f"✓ Price unchanged for {formatted_product}")
+            return
+        if self.sync_sheets:
+            self.queue.put(sheet_name, formatted_product, today, str(price))
+        print(f"✓ Queued price for {formatted_product} in {sheet_name}")
+
+    def import_sheet_history(self, platform: str) -> int:
+        """Seed the local store with the history already in the platform's sheet"""
+        return self.store.import_grid(platform, self.load_existing_data(self.sheet_name_for(platform)))
+
+    def export_sheet_history(self, platform: str) -> int:
+        """Regenerate the platform's sheet from the local store"""
+        return self.store.export_to_sheets(self.writer, self.sheet_name_for(platform), platform)
+
+    def merge_shards(self, paths: List[str]) -> int:
+        """
+        Merge shard stores into the local store and write them to Google Sheet at once
+
+        Returns:
+            int: Number of prices merged, or -1 if the sheet write failed
+        """
+        merged = 0
+        for path in paths:
+            for platform, product, date, price in self.store.merge_from(path):
+                self.writer.add(self.sheet_name_for(platform), product, date, price)
+                merged += 1
+            print(f"✓ Merged {path}")
+        return merged if self.writer.flush() else -1
+
+    def start_flusher(self) -> None:
+        """Start draining queued prices to Google Sheet in the background"""
+        if not self.flusher.is_alive():
+            self.flusher.start()
+
+    def flush_to_sheets(self) -> bool:
+        """Stop the background writer and write all remaining queued prices"""
+        return self.flusher.stop()
+
+    def close(self) -> None:
+        """Close the store and queue this scraper opened itself"""
+        if self.owns_store:
+            self.store.close()
+        if self.owns_queue:
+            self.queue.close()
 
 # Example usage:
 # scraper = BaseScraper(driver, "your-spreadsheet-id-here")
-# scraper.save_to_sheets("iPhone 14 Pro (256GB)", "999.99", "Amazon")
\ No newline at end of file
+# scraper.save_to_sheets("iPhone 14 Pro (256GB)", "999.99", "Amazon")
+# scraper.flush_to_sheets()
\ No newline at end of file
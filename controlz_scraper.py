@@ -1,92 +1,129 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from base_scraper import BaseScraper
-from typing import Dict, Optional, Tuple
-import re
-import time
+from page_snapshot import PageSnapshot
+from page_waits import BotWallError, Outcomes
+from http_fetch import fetch_json
+from product_key import product_key, storage_key
+from typing import Dict, Optional, Set, Tuple
 
 class ControlzScraper(BaseScraper):
-    def extract_product_info(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    platform = "Controlz"
+
+    # Shopify store: every product has a JSON view at /products/<handle>.js
+    http_fast_path = True
+
+    # The product JSON lists every variant with its price
+    supports_variants = True
+
+    def page_outcomes(self) -> Outcomes:
+        return {
+            "price": ([self.selector_group("title"), self.selector_group("price")], '₹'),
+        }
+
+    def extract_product_info(self, url: str, page: PageSnapshot) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
         Extract product name, storage variant, and color from the page
         
         Args:
             url (str): Product URL
+            page (PageSnapshot): Snapshot of the product page
             
         Returns:
             Tuple[Optional[str], Optional[str], Optional[str]]: (product_name, storage_variant, color)
         """
         try:
-            time.sleep(2)  # Wait for page load
-            
-            # Try multiple possible selectors for the title
-            title_selectors = [
-                "a.product__title h2.h1",
-            ]
-            
-            title_element = None
-            for selector in title_selectors:
-                try:
-                    title_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if title_element:
-                        break
-                except:
-                    continue
-            if not title_element:
+            full_title = self.find_text(page, "title")
+            if not full_title:
                 # Fallback to URL-based extraction
                 product_name = url.split('/')[-1].replace('-', ' ').title()
                 return product_name, None, None
             
-            #Variant Selector
-            variant_selectors = [
-                'div.var_container input[type="radio"]:not([disabled]) + label',
-            ]
-            
-            variant_element = None
-            for selector in variant_selectors:
-                try:
-                    variant_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if variant_element:
-                        break
-                except:
-                    continue
-            
-            if not variant_element:
+            variant_text = self.find_text(page, "variant")
+            if not variant_text:
                 # Fallback to URL-based extraction
                 product_name = url.split('/')[-1].replace('-', ' ').title()
                 return product_name, None, None
-            
-            full_title = title_element.get_attribute('textContent').strip()
-            variant_text = variant_element.text.strip()
-            
-            # Pattern to match product details: name (color, storage)
 
-            if full_title and variant_text:
-                print(full_title)
-                print(variant_text)
-                return full_title, variant_text, " "
-            else:
-                # Fallback pattern matching
-                storage_match = re.search(r'(\d+)\s*(?:GB|TB)', full_title, re.IGNORECASE)
-                storage = f"{storage_match.group(1)}GB" if storage_match else None
-                
-                color_pattern = r'\(([\w\s]+)\)'
-                color_match = re.search(color_pattern, full_title)
-                color = color_match.group(1) if color_match else None
-                
-                # Clean product name
-                product_name = re.sub(r'\(.*?\)', '', full_title).strip()
-                return product_name, storage, color
-                
+            # The variant label is the storage ("128 GB"); the page does not name the color
+            key = product_key(f"{full_title} | {variant_text}")
+            if key:
+                return key.name, key.storage, None
+            return full_title.strip(), storage_key(variant_text), None
+
         except Exception as e:
             print(f"Error extracting product info: {e}")
             return None, None, None
 
+    def extract_price(self, page: PageSnapshot) -> Optional[str]:
+        """
+        Return the sale price in rupees, or None if not found
+        """
+        price_text = self.find_text(page, "price", accept=lambda text: '₹' in text)
+        if not price_text:
+            return None
+        return price_text.replace(",", "").replace("₹", "").strip()
+
+    def extract_fast(self, url: str) -> Optional[Tuple[str, str]]:
+        """
+        Price the product from Shopify's product JSON
+
+        Mirrors the browser path: the first available variant is used and its
+        first option (the storage) becomes part of the product name.
+
+        Returns:
+            Optional[Tuple[str, str]]: (full product name, price), or None to fall back to Selenium
+        """
+        product = self._product_json(url)
+        if not product:
+            return None
+
+        variant = next((v for v in product.get('variants', []) if v.get('available')), None)
+        if not variant or variant.get('price') is None:
+            return None
+        return self._variant_name(product, variant), self._variant_price(variant)
+
+    @staticmethod
+    def _product_json(url: str) -> Optional[Dict]:
+        """Fetch Shopify's JSON view of a product page"""
+        product = fetch_json(url.split('?')[0].rstrip('/') + '.js')
+        if not isinstance(product, dict) or not product.get('title'):
+            return None
+        return product
+
+    @staticmethod
+    def _variant_name(product: Dict, variant: Dict) -> str:
+        storage = variant.get('option1') or variant.get('title')
+        product_name = product['title'].strip()
+        return f"{product_name} ({storage})" if storage else product_name
+
+    @staticmethod
+    def _variant_price(variant: Dict) -> str:
+        # Shopify reports prices in paise
+        return str(int(variant['price']) // 100)
+
+    def fetch_variants(self, url: str, wanted: Set[Optional[str]]) -> Dict[Optional[str], Tuple[str, str]]:
+        """
+        Read every variant from the product JSON without opening the browser
+
+        Variants that are sold out are reported as "Out of Stock". The first
+        available variant, the one the page opens with, is also returned under
+        the key None. Falls back to switching variants in the browser when the
+        JSON is unavailable.
+        """
+        product = self._product_json(url)
+        if not product:
+            return super().fetch_variants(url, wanted)
+
+        found: Dict[Optional[str], Tuple[str, str]] = {}
+        for variant in product.get('variants', []):
+            storage = storage_key(variant.get('option1') or variant.get('title'))
+            if not storage or storage in found or variant.get('price') is None:
+                continue
+            price = self._variant_price(variant) if variant.get('available') else "Out of Stock"
+            found[storage] = (self._variant_name(product, variant), price)
+            if variant.get('available') and None not in found:
+                found[None] = found[storage]
+        return found
+
     def fetch_price(self, url: str) -> Optional[str]:
         """
         Fetch price from the product page
@@ -98,31 +135,20 @@ class ControlzScraper(BaseScraper):
             Optional[str]: Price if found, None otherwise
         """
         try:
-            self.driver.get(url)
-            time.sleep(2)  # Wait for page to load
-            
+            price = self.fetch_price_fast(url)
+            if price:
+                return price
+
+            self.load_page(url)
+            self.wait_for_outcome(self.page_outcomes())
+
+            page = self.snapshot(url)
+
             # Extract product info
-            product_name, storage, color = self.extract_product_info(url)
-            
-            # Try multiple possible selectors for price
-            price_selectors = [
-                '.price__sale .price-item--sale',
-            ]
-            
-            price_tag = None
-            for selector in price_selectors:
-                try:
-                    price_tag = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if price_tag and '₹' in price_tag.text:
-                        break
-                except:
-                    continue
-
-            if price_tag and product_name:
-                price = price_tag.text.strip().replace(",", "").replace("₹", "")
-                
+            product_name, storage, color = self.extract_product_info(url, page)
+            price = self.extract_price(page)
+
+            if price and product_name:
                 # Format full product name with color and storage
                 if storage:
                     full_product_name = f"{product_name} ({storage})"
@@ -138,6 +164,8 @@ class ControlzScraper(BaseScraper):
                 print(f"Could not find price element for {product_name}")
                 return None
                 
+        except BotWallError:
+            raise
         except Exception as e:
             print(f"Error fetching price from Controlz: {e}")
         return None
\ No newline at end of file
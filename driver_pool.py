@@ -0,0 +1,211 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from page_waits import BotWallError
+from scheduler import Job, ScrapeScheduler
+
+
+class DriverPool:
+    """
+    Scrape URLs in parallel with a fixed number of Chrome instances.
+
+    Each worker thread starts its own WebDriver and builds one scraper per
+    platform around it, then takes (platform, product name, URL) jobs from a
+    shared ScrapeScheduler until none are left. Drivers are always quit, and
+    the scrapers closed, when their worker exits. A page that turns out to be
+    a bot check clears the driver's cookies and is handed back to the
+    scheduler for a later retry.
+
+    A job can stand for a whole model family, whose scraper reads every
+    configured storage variant from one page, or for a search results page
+    that lists many configured products. Products such a page did not
+    price are queued again as ordinary jobs for their own URLs.
+    """
+
+    def __init__(self, driver_factory: Callable[[], object],
+                 scraper_factory: Callable[[str, object], object], workers: int = 1,
+                 max_per_domain: Optional[int] = None, report_every: float = 60.0):
+        self.driver_factory = driver_factory
+        self.scraper_factory = scraper_factory
+        self.workers = max(1, workers)
+        self.max_per_domain = max_per_domain
+        # Seconds between pacing reports while the run is in progress
+        self.report_every = report_every
+        self.scheduler: Optional[ScrapeScheduler] = None
+        self.results: Dict[Tuple[str, str], Optional[str]] = {}
+        # Representative job -> every job of its model family
+        self.families: Dict[Job, List[Job]] = {}
+        # Search results job -> product jobs it covers
+        self.listings: Dict[Job, List[Job]] = {}
+        self.lock = threading.Lock()
+
+    def _worker(self) -> None:
+        driver = None
+        # Scrapers for this worker's driver, created on first job per platform
+        scrapers = {}
+        try:
+            driver = self.driver_factory()
+
+            while True:
+                job = self.scheduler.acquire()
+                if job is None:
+                    return
+                blocked, failed = False, True
+                missing = []
+                try:
+                    platform = job[0]
+                    if platform not in scrapers:
+                        scrapers[platform] = self.scraper_factory(platform, driver)
+                    scraper = scrapers[platform]
+                    if job in self.listings:
+                        blocked, failed, missing = self._scrape_group(
+                            job, self.listings, lambda members: scraper.harvest_listing(job[2], members),
+                            "search results for"
+                        )
+                    elif job in self.families:
+                        blocked, failed, missing = self._scrape_group(
+                            job, self.families, scraper.scrape_variants, "variants of"
+                        )
+                    else:
+                        blocked, failed = self._scrape(scrapers[platform], job)
+                    if blocked:
+                        self._reset_session(driver)
+                finally:
+                    # Products a family or search page did not price are scraped from their own URLs.
+                    # Queued before the release, so no idle worker sees an empty run and exits.
+                    if missing:
+                        self.scheduler.add(missing)
+                    if not self.scheduler.release(job, blocked, failed) and blocked:
+                        with self.lock:
+                            for member in self.listings.get(job) or self.families.get(job) or [job]:
+                                self.results[(member[0], member[1])] = None
+
+        except Exception as e:
+            print(f"✗ Worker {threading.current_thread().name} stopped: {e}")
+        finally:
+            for scraper in scrapers.values():
+                try:
+                    scraper.close()
+                except Exception:
+                    pass
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    def _scrape(self, scraper, job: Job) -> Tuple[bool, bool]:
+        """
+        Scrape one job and record its price
+
+        Returns:
+            Tuple[bool, bool]: (a bot check page was served, no price was scraped)
+        """
+        platform, product_name, url = job
+        price = None
+        try:
+            print(f"\nProcessing {product_name} ({platform})...")
+            price = scraper.scrape(product_name, url)
+            if price:
+                print(f"✓ {product_name}: ₹{price}")
+            else:
+                print(f"✗ Failed to fetch price for {product_name}")
+        except BotWallError as e:
+            print(f"✗ {e}")
+            return True, False
+        except Exception as e:
+            print(f"✗ Error processing {product_name}: {e}")
+
+        with self.lock:
+            self.results[(platform, product_name)] = price
+        return False, not price or price.startswith("Error")
+
+    def _scrape_group(self, job: Job, groups: Dict[Job, List[Job]],
+                      scrape: Callable[[List[Tuple[str, str]]], Dict[str, str]],
+                      label: str) -> Tuple[bool, bool, List[Job]]:
+        """
+        Scrape several configured products from one page load
+
+        Args:
+            job (Job): Job standing for the group
+            groups (Dict[Job, List[Job]]): self.families or self.listings
+            scrape (Callable): Takes (product name, URL) pairs, returns price per product name
+            label (str): Describes the page in progress messages
+
+        Returns:
+            Tuple[bool, bool, List[Job]]: (a bot check page was served, nothing was priced,
+                jobs of the products that were not priced)
+        """
+        members = groups[job]
+        platform = job[0]
+        try:
+            print(f"\nProcessing {label} {job[1]}: {len(members)} products ({platform})...")
+            prices = scrape([(product_name, url) for _, product_name, url in members])
+        except BotWallError as e:
+            print(f"✗ {e}")
+            return True, False, []
+
+        missing = [member for member in members if member[1] not in prices]
+        with self.lock:
+            for product_name, price in prices.items():
+                print(f"✓ {product_name}: ₹{price}")
+                self.results[(platform, product_name)] = price
+            # The group is done; its missing products become ordinary jobs
+            del groups[job]
+        if missing:
+            print(f"Scraping {len(missing)} products of {job[1]} from their own pages")
+        return False, not prices, missing
+
+    @staticmethod
+    def _reset_session(driver) -> None:
+        """Drop the cookies that tied this browser to the blocked session"""
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            pass
+
+    def run(self, jobs: Iterable[Job], families: Optional[Dict[Job, List[Job]]] = None,
+            listings: Optional[Dict[Job, List[Job]]] = None) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Scrape all jobs and wait for every worker to finish
+
+        Args:
+            jobs (Iterable[Job]): (platform, product name, URL) triples
+            families (Optional[Dict[Job, List[Job]]]): Jobs that stand for a model family,
+                mapped to every job of the family (see variants.group_families)
+            listings (Optional[Dict[Job, List[Job]]]): Search results jobs, mapped to the
+                product jobs they cover (see listings.group_listings)
+
+        Returns:
+            Dict[Tuple[str, str], Optional[str]]: Price (or None) per (platform, product name)
+        """
+        self.families = dict(families or {})
+        self.listings = dict(listings or {})
+        self.scheduler = ScrapeScheduler(jobs, max_per_domain=self.max_per_domain)
+
+        threads = [
+            threading.Thread(target=self._worker, name=f"driver-{i + 1}", daemon=True)
+            for i in range(min(self.workers, self.scheduler.pending()))
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(self.report_every)
+                    if thread.is_alive():
+                        print("\nScrape progress:")
+                        self.scheduler.report()
+        except KeyboardInterrupt:
+            # Let every worker finish its current page and quit its driver
+            self.cancel()
+            for thread in threads:
+                thread.join()
+            raise
+
+        return self.results
+
+    def cancel(self) -> None:
+        """Drop all jobs that have not been started yet"""
+        if self.scheduler:
+            self.scheduler.cancel()
@@ -1,106 +1,86 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from base_scraper import BaseScraper
+from page_snapshot import PageSnapshot
+from page_waits import BotWallError, Outcomes
+from product_key import product_key, storage_key
 from typing import Dict, Optional, Tuple
 import re
-import time
+
+# Color before the storage in "(Blue, 128 GB)"
+COLOR_PATTERN = re.compile(r"\(([\w\s]+),\s*\d+\s*[GT]B\)")
 
 class FlipkartScraper(BaseScraper):
-    def extract_product_info(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    platform = "Flipkart"
+
+    # Storage swatches link to the other variants of the model
+    supports_variants = True
+
+    # Search result cards show title and price for a whole model range
+    search_url = "https://www.flipkart.com/search?q={query}"
+
+    def page_outcomes(self) -> Outcomes:
+        """Raced together so a page costs at most one timeout"""
+        return {
+            "notify_me": ([self.selector_group("notify_me")], None),
+            "price": ([self.selector_group("title"), self.selector_group("price")], '₹'),
+        }
+
+    def extract_product_info(self, url: str, page: PageSnapshot) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         try:
-            time.sleep(2)
-            
-            title_selectors = [
-                "span.VU-ZEz",
-            ]
-            
-            title_element = None
-            for selector in title_selectors:
-                try:
-                    title_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if title_element:
-                        break
-                except:
-                    continue
+            full_title = self.find_text(page, "title")
             
-            if not title_element:
+            if not full_title:
                 product_name = url.split('/')[-1].replace('-', ' ').title()
                 return product_name, None, None
-            
-            full_title = title_element.text.strip()
-            
-            pattern = r"([\w\s]+)\s*\(([\w\s]+),\s*(\d+\s*[GT]B)\)"
-            match = re.search(pattern, full_title)
-            
-            if match:
-                product_name = match.group(1).strip()
-                color = match.group(2).strip() 
-                storage = match.group(3).strip().replace(" ", "")
-                return product_name, storage, color
-            else:
-                storage_match = re.search(r'(\d+)\s*(?:GB|TB)', full_title, re.IGNORECASE)
-                storage = f"{storage_match.group(1)}GB" if storage_match else None
-                
-                color_pattern = r'\(([\w\s]+)\)'
-                color_match = re.search(color_pattern, full_title)
-                color = color_match.group(1) if color_match else None
-                
-                product_name = re.sub(r'\(.*?\)', '', full_title).strip()
-                return product_name, storage, color
+
+            return self.parse_title(full_title)
                 
         except Exception as e:
             print(f"Error extracting product info: {e}")
             return None, None, None
 
-    def fetch_price(self, url: str) -> Optional[str]:
-        try:
-            self.driver.get(url)
-            time.sleep(2)
-            
-            product_name, storage, color = self.extract_product_info(url)
+    def parse_title(self, full_title: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Split a Flipkart title, e.g. "Apple iPhone 13 (Blue, 128 GB)", into product name, storage and color"""
+        key = product_key(full_title)
+        if key:
+            color_match = COLOR_PATTERN.search(full_title)
+            return key.name, key.storage, color_match.group(1).strip() if color_match else None
+        else:
+            storage = storage_key(full_title)
             
-            # Check for Notify Me button first
-            try:
-                notify_me = self.driver.find_element(By.CLASS_NAME, 'QqFHMw.AMnSvF.v6sqKe')
-                if notify_me:
-                    full_product_name = f"{product_name} ({storage})" if storage else product_name
-                    self.save_to_sheets(full_product_name, "Out of stock", "Flipkart")
-                    print(f"✓ Scraped: {full_product_name} - Out of stock")
-                    return "Out of stock"
-            except:
-                pass
+            color_pattern = r'\(([\w\s]+)\)'
+            color_match = re.search(color_pattern, full_title)
+            color = color_match.group(1) if color_match else None
             
-            price_selectors = [
-                'div._30jeq3._16Jk6d',
-                'div.Nx9bqj.CxhGGd',
-                '._30jeq3', 
-                '.product-price'
-            ]
-            
-            price_tag = None
-            for selector in price_selectors:
-                try:
-                    price_tag = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if price_tag and '₹' in price_tag.text:
-                        break
-                except:
-                    continue
+            product_name = re.sub(r'\(.*?\)', '', full_title).strip()
+            return product_name, storage, color
 
-            if price_tag and product_name:
-                price = price_tag.text.strip().replace(",", "").replace("₹", "")
-                
-                try:
-                    out_of_stock = self.driver.find_element(By.CLASS_NAME, '_16FRp0').text
-                    if 'OUT OF STOCK' in out_of_stock.upper():
-                        price = "Out of Stock"
-                except:
-                    pass
+    def extract_price(self, page: PageSnapshot) -> Optional[str]:
+        """
+        Return the price in rupees, "Out of stock"/"Out of Stock", or None if nothing was found
+        """
+        # Check for Notify Me button first
+        if self.find_text(page, "notify_me") is not None:
+            return "Out of stock"
+
+        price_text = self.find_text(page, "price", accept=lambda text: '₹' in text)
+        if not price_text:
+            return None
+
+        price = price_text.strip().replace(",", "").replace("₹", "")
+        if self.find_text(page, "out_of_stock", accept=lambda text: 'OUT OF STOCK' in text.upper()):
+            return "Out of Stock"
+        return price
+
+    def fetch_price(self, url: str) -> Optional[str]:
+        try:
+            self.load_page(url)
+            self.wait_for_outcome(self.page_outcomes())
+
+            page = self.snapshot(url)
+            product_name, storage, color = self.extract_product_info(url, page)
+            price = self.extract_price(page)
 
+            if price and product_name:
                 full_product_name = f"{product_name} ({storage})" if storage else product_name
                 self.save_to_sheets(full_product_name, price, "Flipkart")
                 
@@ -110,6 +90,8 @@ class FlipkartScraper(BaseScraper):
             print(f"Price not found for {product_name}")
             return None
                 
+        except BotWallError:
+            raise
         except Exception as e:
             print(f"Error fetching price from Flipkart: {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from page_snapshot import PageSnapshot
+
+DEFAULT_TIMEOUT = 10.0
+
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide keep-alive HTTP session, creating it on first call"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=1)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def fetch_html(url: str, timeout: float = DEFAULT_TIMEOUT) -> Optional[str]:
+    """Fetch a page with a plain HTTP GET, returning None on any failure"""
+    try:
+        response = get_http_session().get(url, timeout=timeout)
+        if response.status_code != 200:
+            print(f"HTTP fast path got status {response.status_code} for {url}")
+            return None
+        # Without a declared charset requests assumes ISO-8859-1, which garbles "₹"
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = response.apparent_encoding
+        return response.text
+    except requests.RequestException as e:
+        print(f"HTTP fast path failed for {url}: {e}")
+        return None
+
+
+def fetch_json(url: str, timeout: float = DEFAULT_TIMEOUT) -> Optional[Any]:
+    """Fetch and decode a JSON document, returning None on any failure"""
+    try:
+        response = get_http_session().get(url, timeout=timeout, headers={"Accept": "application/json"})
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"HTTP fast path failed for {url}: {e}")
+        return None
+
+
+def _walk(node: Any) -> Iterator[Dict]:
+    """Yield every JSON object nested anywhere in a JSON-LD document"""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def offer_from_json_ld(page: PageSnapshot) -> Optional[Tuple[str, bool]]:
+    """
+    Read the first offer price from the page's JSON-LD blocks
+
+    Returns:
+        Optional[Tuple[str, bool]]: (price, in_stock), or None if no offer has a price
+    """
+    for script in page.soup.select('script[type="application/ld+json"]'):
+        try:
+            document = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for node in _walk(document):
+            types = node.get("@type", "")
+            types = types if isinstance(types, list) else [types]
+            if "Offer" not in types and "AggregateOffer" not in types:
+                continue
+            price = node.get("price", node.get("lowPrice"))
+            if price in (None, ""):
+                continue
+            availability = str(node.get("availability", ""))
+            in_stock = not any(state in availability for state in ("OutOfStock", "SoldOut", "Discontinued"))
+            return str(price), in_stock
+    return None
+
+
+def clean_price(price: str) -> Optional[str]:
+    """Turn "₹64,999.00" or "64999" into "64999", or None if it is not a number"""
+    text = str(price).replace(",", "").replace("₹", "").strip()
+    try:
+        return str(int(float(text)))
+    except ValueError:
+        return None
@@ -0,0 +1,52 @@
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import quote_plus
+from scheduler import Job
+from variants import split_variant
+
+# Result cards for other conditions than the configured new products
+EXCLUDED_PATTERN = re.compile(r"\b(renewed|refurbished|pre-owned|used)\b", re.IGNORECASE)
+
+
+def is_excluded(title: str) -> bool:
+    """Check whether a listing title is for a renewed or used product"""
+    return EXCLUDED_PATTERN.search(title) is not None
+
+
+def _search_query(product_name: str) -> str:
+    # One search per generation: "iphone 13 pro max(256 gb)" -> "apple iphone 13"
+    family = split_variant(product_name)[0]
+    generation = re.match(r".*?\d+", family)
+    query = generation.group(0) if generation else family
+    return query if query.startswith("apple") else f"apple {query}"
+
+
+def group_listings(jobs: Iterable[Job], search_urls: Dict[str, str]) -> Tuple[List[Job], Dict[Job, List[Job]]]:
+    """
+    Replace product page jobs by search result pages that list them
+
+    Jobs of a platform with a search URL are grouped by model generation;
+    each group becomes one job for the search page of that generation.
+
+    Args:
+        jobs (Iterable[Job]): Product page jobs
+        search_urls (Dict[str, str]): Platform -> search URL with a {query} placeholder
+
+    Returns:
+        Tuple[List[Job], Dict[Job, List[Job]]]: (jobs to schedule, search job -> product jobs it covers)
+    """
+    groups: "OrderedDict[Tuple[str, str], List[Job]]" = OrderedDict()
+    scheduled = []
+    for job in jobs:
+        if job[0].lower() in search_urls:
+            groups.setdefault((job[0].lower(), _search_query(job[1])), []).append(job)
+        else:
+            scheduled.append(job)
+
+    listings = {}
+    for (platform, query), members in groups.items():
+        listing_job = (members[0][0], f"{query} (search)", search_urls[platform].format(query=quote_plus(query)))
+        scheduled.append(listing_job)
+        listings[listing_job] = members
+    return scheduled, listings
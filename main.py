@@ -1,10 +1,24 @@
 import argparse
 import json
-from selenium import webdriver
+from googleapiclient.errors import HttpError
+from browser_profile import FULL_PROFILE, LEAN_PROFILE, create_driver, load_browser_profile
+from base_scraper import BaseScraper
 from amazon_scraper import AmazonScraper
 from flipkart_scraper import FlipkartScraper
 from cashify_scraper import CashifyScraper
 from controlz_scraper import ControlzScraper
+from driver_pool import DriverPool
+from page_waits import get_latency_stats
+from selector_registry import get_selector_registry
+from price_store import DEFAULT_STORE_PATH
+from price_matrix import PriceMatrix
+from price_cache import ChangeLog, get_price_cache
+from page_archive import DEFAULT_ARCHIVE_PATH, compare_replay, replay
+from rolling_stats import RollingStats
+from refresh_planner import DEFAULT_MAX_AGE_DAYS, RefreshPlanner
+from sharding import filter_jobs, parse_shard
+from variants import group_families
+from listings import group_listings
 
 def load_platform_urls(filename="platform_urls.json"):
     """Load platform URLs from the configuration file"""
@@ -15,75 +29,312 @@ def load_platform_urls(filename="platform_urls.json"):
         print(f"Error loading configuration file: {e}")
         return {}
 
-def initialize_webdriver():
-    """Initialize Chrome WebDriver with options"""
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    return webdriver.Chrome(options=options)
+def initialize_webdriver(profile_name=LEAN_PROFILE):
+    """Initialize Chrome WebDriver with the named performance profile"""
+    return create_driver(load_browser_profile(profile_name))
+
+def report_price_signals(recorder):
+    """Advance the rolling price statistics over the newly stored days and print new lows and anomalies"""
+    rolling_stats = RollingStats()
+    rolling_stats.report(rolling_stats.update(recorder.store))
+    rolling_stats.save()
 
 def main():
     # Load platform URLs from the configuration file
     platform_urls = load_platform_urls()
 
     # Define the argument parser
-    parser = argparse.ArgumentParser(description="Run scraper for a specific platform.")
+    parser = argparse.ArgumentParser(description="Run scrapers for one or more platforms.")
     parser.add_argument(
         "-p", 
         "--platform", 
         type=str, 
         required=True, 
-        help="Platform to scrape (Amazon, Flipkart, Cashify, Controlz)"
+        help="Platform to scrape (Amazon, Flipkart, Cashify, Controlz), a comma-separated list, or 'all'"
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=None,
+        help="Write queued prices to Google Sheets in batches of N products (default: 100)"
+    )
+    parser.add_argument(
+        "--sheet-layout",
+        choices=["wide", "long"],
+        default="wide",
+        help="wide: one column per date in {platform}_prices; long: append-only (date, product, price) rows in {platform}_history"
+    )
+    parser.add_argument(
+        "--import-sheet",
+        action="store_true",
+        help="Copy the platform's existing Google Sheet history into the local price store and exit"
+    )
+    parser.add_argument(
+        "--export-sheet",
+        action="store_true",
+        help="Regenerate the platform's Google Sheet from the local price store and exit"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of Chrome instances scraping in parallel (default: 1)"
+    )
+    parser.add_argument(
+        "--per-domain",
+        type=int,
+        default=None,
+        help="Maximum pages loading at once from a single site, on top of rate_limits.json (default: from rate_limits.json)"
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Scrape only shard i of N (e.g. 2/4) into the local store; combine shards later with --merge"
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=DEFAULT_STORE_PATH,
+        help=f"Local price store file (default: {DEFAULT_STORE_PATH})"
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="STORE",
+        default=None,
+        help="Merge shard store files into the local store and write them to Google Sheets in one batch"
+    )
+    parser.add_argument(
+        "--full-profile",
+        action="store_true",
+        help="Load pages with images, fonts and third-party scripts (default: lean profile from browser_profiles.json)"
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Refresh at most N pages this run, the ones most likely to have changed first (default: all)"
+    )
+    parser.add_argument(
+        "--max-minutes",
+        type=float,
+        default=None,
+        help="Refresh only as many pages as fit in about M minutes, most likely changed first (default: all)"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE_DAYS,
+        help=f"With a page or time budget, always refresh products older than D days (default: {DEFAULT_MAX_AGE_DAYS:g})"
+    )
+    parser.add_argument(
+        "--variants",
+        action="store_true",
+        help="Load one page per model and read every configured storage variant from it"
+    )
+    parser.add_argument(
+        "--listings",
+        action="store_true",
+        help="Price products from search result pages where the platform supports it; "
+             "products not found there are scraped from their own pages"
+    )
+    parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="Report the cheapest platform, price spread, day-over-day changes and new lows of every product "
+             "from the local store instead of scraping"
+    )
+    parser.add_argument(
+        "--since",
+        default=None,
+        help="With --analytics, only use prices from this date on (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--change-log",
+        default=None,
+        help="Append every price change (new, moved, out of stock, back in stock) to this JSON lines file"
+    )
+    parser.add_argument(
+        "--record",
+        nargs="?",
+        const=DEFAULT_ARCHIVE_PATH,
+        default=None,
+        help="Capture every rendered page, its final URL and load time into an archive directory "
+             f"for offline replay (default: {DEFAULT_ARCHIVE_PATH})"
+    )
+    parser.add_argument(
+        "--replay",
+        nargs="?",
+        const=DEFAULT_ARCHIVE_PATH,
+        default=None,
+        help="Run the extractors over an archive recorded with --record, without a browser or network"
+    )
+    parser.add_argument(
+        "--replay-baseline",
+        default=None,
+        help="With --replay, print pages whose extraction differs from this file; "
+             "saves the results there if it does not exist"
     )
     args = parser.parse_args()
 
-    # Initialize Chrome WebDriver
-    driver = initialize_webdriver()
+    # Map platforms to their respective scraper classes
+    scrapers = {
+        "amazon": AmazonScraper,
+        "flipkart": FlipkartScraper,
+        "cashify": CashifyScraper,
+        "controlz": ControlzScraper
+    }
+
+    # "all", a single platform, or a comma-separated list
+    requested = args.platform.lower()
+    if requested == "all":
+        platforms = list(scrapers)
+    else:
+        platforms = [name.strip() for name in requested.split(",") if name.strip()]
+
+    unsupported = [name for name in platforms if name not in scrapers]
+    if unsupported or not platforms:
+        print(f"Platform {', '.join(unsupported) or requested} is not supported.")
+        print(f"Supported platforms: {', '.join(scrapers.keys())}, all")
+        return
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(e)
+            return
+
+    scraper_options = {
+        "flush_every": args.flush_every,
+        "sheet_layout": args.sheet_layout,
+        "store_path": args.store,
+        "sync_sheets": shard is None,
+        "archive_path": args.record
+    }
+
+    if args.replay:
+        results = replay(args.replay, scrapers, platforms)
+        if args.replay_baseline:
+            compare_replay(results, args.replay_baseline)
+        return
 
+    recorder = None
     try:
-        # Map platforms to their respective scraper classes
-        scrapers = {
-            "amazon": AmazonScraper(driver),
-            "flipkart": FlipkartScraper(driver),
-            "cashify": CashifyScraper(driver),
-            "controlz": ControlzScraper(driver)
-        }
-
-        platform = args.platform.lower()
-
-        # Run the scraper for the specified platform
-        if platform in scrapers:
-            scraper = scrapers[platform]
-            platform_data = platform_urls.get(platform)
+        # Owns the Sheets writer, the background flusher, the store and the queue;
+        # workers bring their own drivers and share the rest
+        recorder = BaseScraper(None, **scraper_options)
+
+        if args.merge:
+            count = recorder.merge_shards(args.merge)
+            print(f"✓ Merged {count} prices from {len(args.merge)} shard(s)")
+            return
+
+        if args.import_sheet:
+            for platform in platforms:
+                count = recorder.import_sheet_history(platform)
+                print(f"✓ Imported {count} prices from {recorder.sheet_name_for(platform)} into the local store")
+            return
+
+        if args.export_sheet:
+            for platform in platforms:
+                count = recorder.export_sheet_history(platform)
+                print(f"✓ Exported {count} prices from the local store to {recorder.sheet_name_for(platform)}")
+            return
 
-            if platform_data:
-                print(f"\nFetching prices for {platform.title()}...")
-                print("-" * 50)
-
-                # Iterate through all products for the platform
-                for product_name, url in platform_data.items():
-                    try:
-                        print(f"\nProcessing {product_name}...")
-                        price = scraper.fetch_price(url)
-                        if price:
-                            print(f"✓ {product_name}: ₹{price}")
-                        else:
-                            print(f"✗ Failed to fetch price for {product_name}")
-                    except Exception as e:
-                        print(f"✗ Error processing {product_name}: {e}")
-
-                print("\nScraping completed!")
-            else:
+        if args.analytics:
+            PriceMatrix.from_store(recorder.store, start=args.since, platforms=platforms).report()
+            report_price_signals(recorder)
+            return
+
+        jobs = []
+        for platform in platforms:
+            platform_data = platform_urls.get(platform)
+            if not platform_data:
                 print(f"No URLs found for {platform} in configuration file.")
-        else:
-            print(f"Platform {platform} is not supported.")
-            print(f"Supported platforms: {', '.join(scrapers.keys())}")
+                continue
+            jobs.extend((platform, product_name, url) for product_name, url in platform_data.items())
+
+        if shard:
+            jobs = filter_jobs(jobs, *shard)
+            print(f"Shard {shard[0]}/{shard[1]}: {len(jobs)} URLs, writing to {args.store}")
+
+        if args.max_pages is not None or args.max_minutes is not None:
+            planner = RefreshPlanner(recorder.store, get_latency_stats(), max_age_days=args.max_age)
+            jobs = planner.plan(jobs, args.max_pages, args.max_minutes, args.workers)
+
+        if not jobs:
+            return
+
+        listings = {}
+        if args.listings:
+            jobs, listings = group_listings(
+                jobs, {name: scraper.search_url for name, scraper in scrapers.items() if scraper.search_url}
+            )
+
+        families = {}
+        if args.variants:
+            product_jobs, families = group_families(
+                [job for job in jobs if job not in listings],
+                [name for name, scraper in scrapers.items() if scraper.supports_variants]
+            )
+            jobs = product_jobs + [job for job in jobs if job in listings]
+
+        if recorder.sync_sheets:
+            # Create every missing platform sheet in one request up front
+            try:
+                recorder.session.ensure_sheets([recorder.sheet_name_for(name) for name in platform_urls])
+            except HttpError as error:
+                print(f"Error creating platform sheets: {error}")
+
+            # Drain prices to Google Sheets while scraping continues
+            recorder.start_flusher()
+
+        if args.change_log:
+            get_price_cache().subscribe(ChangeLog(args.change_log))
+
+        print(f"\nFetching prices from {len(jobs)} pages for {', '.join(name.title() for name in platforms)} "
+              f"with {args.workers} worker(s)...")
+        print("-" * 50)
+
+        try:
+            # Each worker owns one Chrome instance and one scraper per platform
+            profile_name = FULL_PROFILE if args.full_profile else LEAN_PROFILE
+            pool = DriverPool(
+                lambda: initialize_webdriver(profile_name),
+                lambda platform, driver: scrapers[platform](driver, store=recorder.store, queue=recorder.queue,
+                                                            **scraper_options),
+                workers=args.workers,
+                max_per_domain=args.per_domain
+            )
+            pool.run(jobs, families, listings)
+            print("\nPer-domain pacing:")
+            pool.scheduler.report()
+        finally:
+            # Page latencies feed the adaptive wait timeouts of the next run
+            get_latency_stats().save()
+            # Selectors that never match are tried last on the next run
+            get_selector_registry().save()
+            get_selector_registry().report()
+            # Last known prices decide what the next run writes
+            get_price_cache().save()
+            get_price_cache().report()
+            # Write whatever is still queued
+            if recorder.sync_sheets:
+                recorder.flush_to_sheets()
+        print("\nScraping completed!")
+        if recorder.sync_sheets:
+            # Shards are folded in by --merge; their prices are picked up by the next full run
+            report_price_signals(recorder)
 
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        driver.quit()
+        if recorder is not None:
+            recorder.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
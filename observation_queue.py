@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+DEFAULT_QUEUE_PATH = "observations.db"
+DEFAULT_BATCH_SIZE = 100
+
+
+class ObservationQueue:
+    """
+    Durable on-disk queue of price observations waiting to be written to Google Sheets.
+
+    Observations are committed to a SQLite database in WAL mode before anything
+    talks to the Sheets API, so a failed write never loses a scraped price.
+    Rows are only removed once they have been acknowledged by the flusher.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS observations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sheet_name TEXT NOT NULL,
+                product TEXT NOT NULL,
+                date TEXT NOT NULL,
+                price TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    def put(self, sheet_name: str, product: str, date: str, price: str) -> None:
+        """Append an observation to the queue"""
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO observations (sheet_name, product, date, price, created_at) VALUES (?, ?, ?, ?, ?)",
+                (sheet_name, product, date, str(price), time.time())
+            )
+            self.connection.commit()
+
+    def peek(self, limit: int = DEFAULT_BATCH_SIZE) -> List[Tuple[int, str, str, str, str]]:
+        """Return the oldest queued observations without removing them"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT id, sheet_name, product, date, price FROM observations ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    def ack(self, ids: List[int]) -> None:
+        """Remove observations that were written successfully"""
+        if not ids:
+            return
+        with self.lock:
+            self.connection.executemany("DELETE FROM observations WHERE id = ?", [(i,) for i in ids])
+            self.connection.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+class QueueFlusher(threading.Thread):
+    """
+    Background thread that drains an ObservationQueue into a SheetsWriter.
+
+    Batches are acknowledged only after the writer reports success. On failure
+    the batch stays queued and the flusher waits with exponential backoff
+    before trying again.
+    """
+
+    def __init__(self, queue: ObservationQueue, writer, batch_size: int = DEFAULT_BATCH_SIZE,
+                 interval: float = 10.0, max_backoff: float = 300.0):
+        super().__init__(name="sheets-flusher", daemon=True)
+        self.queue = queue
+        self.writer = writer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.stop_event = threading.Event()
+
+    def drain_once(self) -> bool:
+        """
+        Write one batch of queued observations
+
+        Returns:
+            bool: True if the batch was written (or the queue was empty), False on error
+        """
+        batch = self.queue.peek(self.batch_size)
+        if not batch:
+            return True
+
+        for _, sheet_name, product, date, price in batch:
+            self.writer.add(sheet_name, product, date, price)
+
+        if not self.writer.flush():
+            # Sheets written before the error are done; retrying them would append them twice
+            self.queue.ack([row[0] for row in batch if row[1] not in self.writer.pending])
+            return False
+
+        self.queue.ack([row[0] for row in batch])
+        return True
+
+    def drain(self) -> bool:
+        """Write queued observations until the queue is empty or a write fails"""
+        while len(self.queue):
+            if not self.drain_once():
+                return False
+        return True
+
+    def _drain_safely(self) -> bool:
+        """Drain the queue, treating any error (not just API errors) as a failed write"""
+        try:
+            return self.drain()
+        except Exception as e:
+            # Network errors such as resets, timeouts or auth transport failures
+            print(f"✗ Error writing queued prices to Google Sheets: {e}")
+            return False
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            if self._drain_safely():
+                self.backoff = 0.0
+                wait = self.interval
+            else:
+                self.backoff = min(max(self.backoff * 2, 1.0), self.max_backoff)
+                wait = self.backoff
+                print(f"Retrying Google Sheets write in {wait:.0f}s...")
+            self.stop_event.wait(wait)
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the background thread and make a final attempt to write the queue
+
+        Returns:
+            bool: True if nothing is left in the queue
+        """
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+        if not self._drain_safely():
+            print(f"✗ {len(self.queue)} prices remain queued in {self.queue.path} and will be retried on the next run")
+            return False
+        return True
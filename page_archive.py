@@ -0,0 +1,193 @@
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from page_snapshot import PageSnapshot
+
+DEFAULT_ARCHIVE_PATH = "page_archive"
+
+# Page kinds; product pages replay through read_page, search pages through read_listing
+PRODUCT_PAGE = "product"
+LISTING_PAGE = "listing"
+
+# Records replayed per task; large enough that process start-up is amortised
+REPLAY_CHUNK = 50
+
+
+class PageArchive:
+    """
+    Compressed, content-addressed archive of rendered pages.
+
+    Each page's HTML is stored once under its SHA-256 as a gzip file, so a
+    page captured on many runs without changes costs no extra space.
+    index.jsonl has one line per capture: platform, page kind, requested
+    URL, final URL after redirects, seconds from navigation to snapshot and
+    the capture time.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self.index_path = os.path.join(path, "index.jsonl")
+        self.lock = threading.Lock()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, "pages", digest[:2], f"{digest}.html.gz")
+
+    def record(self, platform: str, kind: str, url: str, final_url: str, html: str, seconds: float) -> str:
+        """
+        Add a captured page
+
+        Returns:
+            str: SHA-256 of the HTML, its address in the archive
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        entry = {
+            "platform": platform.lower(), "kind": kind, "url": url, "final_url": final_url,
+            "sha256": digest, "seconds": round(seconds, 3), "captured_at": time.time()
+        }
+        with self.lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                # Write then rename, so an interrupted run never leaves a truncated page
+                with gzip.open(f"{blob_path}.tmp", "wb") as file:
+                    file.write(data)
+                os.replace(f"{blob_path}.tmp", blob_path)
+            with open(self.index_path, "a") as file:
+                file.write(json.dumps(entry) + "\n")
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Return the HTML stored under a SHA-256"""
+        with gzip.open(self._blob_path(digest), "rb") as file:
+            return file.read().decode("utf-8")
+
+    def records(self, platforms: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Return the index entries, optionally only of some platforms, oldest first"""
+        wanted = {platform.lower() for platform in platforms} if platforms else None
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        with open(self.index_path, "r") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    if wanted is None or entry["platform"] in wanted:
+                        entries.append(entry)
+        return entries
+
+
+_archives: Dict[str, PageArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_page_archive(path: str = DEFAULT_ARCHIVE_PATH) -> PageArchive:
+    """Return the process-wide PageArchive for a directory; all scrapers share its lock"""
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = PageArchive(path)
+        return _archives[path]
+
+
+def _replay_chunk(path: str, scrapers: Dict[str, Type], entries: List[Dict]) -> List[Tuple[str, Optional[str], float]]:
+    """Extract every entry of a chunk; returns (platform, result, seconds) per entry"""
+    archive = PageArchive(path)
+    # No browser, no Sheets and throwaway stores: extraction only
+    instances = {}
+    results = []
+    for entry in entries:
+        platform = entry["platform"]
+        if platform not in instances:
+            instances[platform] = scrapers[platform](None, store_path=":memory:", queue_path=":memory:",
+                                                     sync_sheets=False)
+        scraper = instances[platform]
+        start = time.perf_counter()
+        try:
+            page = PageSnapshot(archive.load(entry["sha256"]), entry["final_url"])
+            # The extractors' progress messages would drown the summary
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                if entry["kind"] == LISTING_PAGE:
+                    cards = scraper.read_listing(page)
+                    result = f"{len(cards)} cards: " + "; ".join(f"{title} = {price}" for title, price in cards)
+                else:
+                    read = scraper.read_page(entry["url"], page)
+                    result = f"{read[0]} = {read[2]}" if read else None
+        except Exception as e:
+            result = f"Error: {e}"
+        results.append((platform, result, time.perf_counter() - start))
+    return results
+
+
+def replay(path: str, scrapers: Dict[str, Type], platforms: Optional[Iterable[str]] = None,
+           workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """
+    Run the scrapers' extraction over every archived page, without a network
+
+    Product pages go through each scraper's extract_product_info and
+    extract_price (read_page), search pages through read_listing. Pages are
+    spread over worker processes since parsing is CPU-bound.
+
+    Args:
+        path (str): Archive directory
+        scrapers (Dict[str, Type]): Platform name -> scraper class
+        platforms (Optional[Iterable[str]]): Only replay these platforms
+        workers (Optional[int]): Worker processes (default: one per CPU)
+
+    Returns:
+        Dict[str, Optional[str]]: "<platform> <url> <sha256>" -> extracted "name = price", or None
+    """
+    entries = [entry for entry in PageArchive(path).records(platforms) if entry["platform"] in scrapers]
+    # Identical captures of the same URL extract identically; run each once
+    unique = list({(entry["platform"], entry["url"], entry["sha256"]): entry for entry in entries}.values())
+    if not unique:
+        print(f"No archived pages in {path}")
+        return {}
+
+    chunks = [unique[i:i + REPLAY_CHUNK] for i in range(0, len(unique), REPLAY_CHUNK)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk_results = list(executor.map(_replay_chunk, [path] * len(chunks), [scrapers] * len(chunks), chunks))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    totals: Dict[str, List[float]] = {}
+    for entry, (platform, result, seconds) in zip(unique, (item for chunk in chunk_results for item in chunk)):
+        results[f"{platform} {entry['url']} {entry['sha256']}"] = result
+        total = totals.setdefault(platform, [0, 0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += result is not None and not result.startswith("Error")
+        total[2] += seconds
+        total[3] += entry["seconds"]
+
+    print(f"\nReplayed {len(unique)} pages ({len(entries)} captures) in {elapsed:.1f}s:")
+    for platform, (pages, extracted, seconds, live_seconds) in sorted(totals.items()):
+        print(f"  {platform.title()}: {extracted}/{pages} extracted, "
+              f"{seconds / pages * 1000:.0f} ms/page offline vs {live_seconds / pages:.1f} s/page live")
+    return results
+
+
+def compare_replay(results: Dict[str, Optional[str]], baseline_path: str) -> None:
+    """
+    Compare replay results with a saved baseline, or save them as the baseline
+
+    Prints every page whose extraction differs from the baseline.
+    """
+    if not os.path.exists(baseline_path):
+        with open(baseline_path, "w") as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+        print(f"✓ Saved {len(results)} results as the baseline in {baseline_path}")
+        return
+
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)
+    changed = [key for key in results if key in baseline and results[key] != baseline[key]]
+    for key in changed:
+        print(f"✗ {key}\n    was: {baseline[key]}\n    now: {results[key]}")
+    new = sum(1 for key in results if key not in baseline)
+    print(f"{len(changed)} of {len(results) - new} pages changed since the baseline, {new} not in it")
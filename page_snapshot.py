@@ -0,0 +1,55 @@
+from typing import List, Optional
+from bs4 import BeautifulSoup
+
+
+class PageSnapshot:
+    """
+    Parsed copy of a rendered page.
+
+    The rendered HTML is fetched from the browser with a single
+    ``driver.page_source`` call and parsed in-process with lxml, so every
+    selector lookup afterwards is a local operation instead of a round-trip to
+    chromedriver. Text is the element's textContent with whitespace collapsed.
+    """
+
+    def __init__(self, html: str, url: str = "", soup=None):
+        self.html = html
+        self.url = url
+        self.soup = soup if soup is not None else BeautifulSoup(html, "lxml")
+
+    @classmethod
+    def from_driver(cls, driver, url: str = "") -> "PageSnapshot":
+        """Snapshot the page currently loaded in a WebDriver"""
+        return cls(driver.page_source, url)
+
+    def sections(self, selector: str) -> List["PageSnapshot"]:
+        """
+        Return every element matching a CSS selector as its own snapshot
+
+        Lookups on a section only see that element, e.g. one result card of a
+        search page. Sections share the parsed tree; nothing is parsed again.
+        """
+        try:
+            elements = self.soup.select(selector)
+        except Exception:
+            return []
+        return [PageSnapshot("", self.url, soup=element) for element in elements]
+
+    @staticmethod
+    def _text(element) -> str:
+        return " ".join(element.get_text().split())
+
+    def texts(self, selector: str) -> List[str]:
+        """Return the text of every element matching a CSS selector"""
+        try:
+            return [self._text(element) for element in self.soup.select(selector)]
+        except Exception:
+            return []
+
+    def attribute(self, selector: str, name: str) -> Optional[str]:
+        """Return an attribute of the first element matching a CSS selector"""
+        try:
+            element = self.soup.select_one(selector)
+        except Exception:
+            return None
+        return element.get(name) if element is not None else None
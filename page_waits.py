@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_STATS_PATH = "latency_stats.json"
+
+# Latencies kept per platform; older samples are dropped
+MAX_SAMPLES = 200
+
+# Below this many samples the default timeout is used
+MIN_SAMPLES = 10
+
+POLL_INTERVAL = 0.1
+
+# Pages with carousels or timers never stop mutating; stop waiting for
+# quiet this long after everything is present
+MAX_SETTLE = 1.0
+
+# Single round-trip readiness probe. A MutationObserver is installed on the
+# first call for each document and records the time of the last DOM change.
+# Outcomes are checked in order and the first whose selector groups all match
+# wins; an optional text must appear in an element of the last group.
+RACE_SCRIPT = """
+const outcomes = arguments[0];
+if (!window.__scraperLastMutation) {
+    window.__scraperLastMutation = Date.now();
+    new MutationObserver(() => { window.__scraperLastMutation = Date.now(); })
+        .observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+}
+let winner = null;
+for (const [name, groups, text] of outcomes) {
+    const matched = groups.every((selector, i) => {
+        const elements = document.querySelectorAll(selector);
+        if (!elements.length) return false;
+        if (text && i === groups.length - 1) {
+            return Array.from(elements).some(element => element.textContent.includes(text));
+        }
+        return true;
+    });
+    if (matched) { winner = name; break; }
+}
+return {
+    ready: document.readyState !== 'loading',
+    winner: winner,
+    quiet: Date.now() - window.__scraperLastMutation
+};
+"""
+
+class LatencyStats:
+    """
+    Page readiness latencies per platform, persisted between runs.
+
+    Timeouts are derived from the recorded 95th percentile so slow platforms
+    still get enough time while a dead page is given up on quickly. Waits
+    that time out are recorded at the timeout, a lower bound of their real
+    latency: once more than 5% of pages time out, the percentile reaches the
+    timeout and the next timeout is ``factor`` times longer, up to
+    ``max_timeout``.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATS_PATH, factor: float = 2.0,
+                 min_timeout: float = 3.0, max_timeout: float = 20.0):
+        self.path = path
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    self.samples = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Error loading latency stats: {e}")
+
+    def record(self, platform: str, seconds: float) -> None:
+        """Record how long a page of a platform took to become ready"""
+        with self.lock:
+            samples = self.samples.setdefault(platform.lower(), [])
+            samples.append(round(seconds, 3))
+            del samples[:-MAX_SAMPLES]
+
+    def percentile(self, platform: str, percentile: float) -> Optional[float]:
+        """Return a latency percentile for a platform, or None without enough samples"""
+        with self.lock:
+            samples = sorted(self.samples.get(platform.lower(), []))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    def timeout_for(self, platform: str, default: float) -> float:
+        """Return an adaptive wait timeout for a platform"""
+        p95 = self.percentile(platform, 95)
+        if p95 is None:
+            return default
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.factor))
+
+    def save(self) -> None:
+        """Write the recorded latencies to disk"""
+        with self.lock:
+            try:
+                with open(self.path, "w") as file:
+                    json.dump(self.samples, file)
+            except OSError as e:
+                print(f"Error saving latency stats: {e}")
+
+
+_stats: Optional[LatencyStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_latency_stats() -> LatencyStats:
+    """Return the process-wide LatencyStats, loading it on first call"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = LatencyStats()
+        return _stats
+
+
+# name -> (CSS selector groups that must all match, optional text in the last group)
+Outcomes = Dict[str, Tuple[List[str], Optional[str]]]
+
+# Outcome raced against every page for platforms with "bot_wall" selectors
+BOT_WALL = "bot_wall"
+
+
+class BotWallError(Exception):
+    """The site served a bot check or CAPTCHA page instead of the requested page"""
+
+    def __init__(self, platform: str, url: str):
+        super().__init__(f"{platform} served a bot check page for {url}")
+        self.platform = platform
+        self.url = url
+
+
+def wait_for_first(driver, outcomes: Outcomes, timeout: float,
+                   settle: float = 0.3) -> Tuple[Optional[str], float]:
+    """
+    Watch several possible page outcomes at once and return whichever appears first
+
+    All outcomes are checked in one execute_script call per poll, so the worst
+    case is a single timeout rather than one timeout per outcome. When several
+    outcomes match on the same poll the one listed first wins.
+
+    Args:
+        driver: Selenium WebDriver
+        outcomes (Outcomes): Named outcomes, e.g. {"price": (["span.price"], "₹"),
+            "notify_me": (["button.notify"], "Notify Me")}
+        timeout (float): Seconds to wait at most
+        settle (float): Seconds without DOM mutations required after an outcome matched
+
+    Returns:
+        Tuple[Optional[str], float]: (winning outcome or None on timeout, seconds waited)
+    """
+    payload = [[name, groups, text] for name, (groups, text) in outcomes.items()]
+    start = time.monotonic()
+    settle_ms = settle * 1000
+    found_at = None
+    while True:
+        try:
+            state = driver.execute_script(RACE_SCRIPT, payload)
+        except Exception:
+            # The page may be navigating; try again on the next poll
+            state = None
+
+        elapsed = time.monotonic() - start
+        if state and state["ready"] and state["winner"]:
+            if found_at is None:
+                found_at = elapsed
+            if state["quiet"] >= settle_ms or elapsed - found_at >= MAX_SETTLE:
+                return state["winner"], elapsed
+        else:
+            found_at = None
+        if elapsed >= timeout:
+            return None, elapsed
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+from price_store import parse_price
+
+DEFAULT_CACHE_PATH = "last_prices.json"
+
+NEW = "new"
+PRICE_CHANGED = "price_changed"
+OUT_OF_STOCK = "out_of_stock"
+BACK_IN_STOCK = "back_in_stock"
+
+
+class PriceChange(NamedTuple):
+    """A product whose price or stock state differs from the last known one"""
+    platform: str
+    product: str
+    kind: str
+    price: str
+    previous: Optional[str]
+    observed_at: float
+
+
+class PriceCache:
+    """
+    Last known price and stock state per platform and canonical product.
+
+    Every scraped price is compared with the last known one. Real changes
+    (a new product, a price move, going out of or back in stock) become
+    change events that are passed to subscribers; unchanged prices only
+    refresh the entry's last-seen time in memory. The state is written to
+    disk once per run, so the next run compares with it.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        # platform -> product -> {"price", "changed_at", "seen_at"}
+        self.entries: Dict[str, Dict[str, Dict]] = {}
+        self.subscribers: List[Callable[[PriceChange], None]] = []
+        self.changes = 0
+        self.heartbeats = 0
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Error loading last known prices: {e}")
+
+    def subscribe(self, callback: Callable[[PriceChange], None]) -> None:
+        """Call ``callback`` with every change event from now on"""
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def get(self, platform: str, product: str) -> Optional[Dict]:
+        """Return the last known {"price", "changed_at", "seen_at"} of a product, if any"""
+        with self.lock:
+            entry = self.entries.get(platform.lower(), {}).get(product)
+            return dict(entry) if entry else None
+
+    def observe(self, platform: str, product: str, price: str) -> Optional[PriceChange]:
+        """
+        Compare a scraped price with the last known one and record it
+
+        Args:
+            platform (str): Platform name
+            product (str): Canonical product name
+            price (str): Price as scraped, e.g. "₹64,999" or "Out of Stock"
+
+        Returns:
+            Optional[PriceChange]: The change event, or None if nothing changed
+        """
+        now = time.time()
+        price = str(price)
+        with self.lock:
+            products = self.entries.setdefault(platform.lower(), {})
+            entry = products.get(product)
+            kind = self._change_kind(entry["price"] if entry else None, price)
+            if kind is None:
+                entry["seen_at"] = now
+                self.heartbeats += 1
+                return None
+            products[product] = {"price": price, "changed_at": now, "seen_at": now}
+            self.changes += 1
+            subscribers = list(self.subscribers)
+
+        change = PriceChange(platform.lower(), product, kind, price, entry["price"] if entry else None, now)
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"⚠ Price change subscriber failed: {e}")
+        return change
+
+    @staticmethod
+    def _change_kind(previous: Optional[str], price: str) -> Optional[str]:
+        if previous is None:
+            return NEW
+        previous_value, previous_in_stock = parse_price(previous)
+        value, in_stock = parse_price(price)
+        if previous_in_stock != in_stock:
+            return BACK_IN_STOCK if in_stock else OUT_OF_STOCK
+        if not in_stock:
+            return None
+        # Compare amounts so "₹64,999" and "64999" are the same price
+        if value is not None and previous_value is not None:
+            return PRICE_CHANGED if value != previous_value else None
+        return PRICE_CHANGED if price.strip() != previous.strip() else None
+
+    def save(self) -> None:
+        """Write the last known prices to disk"""
+        with self.lock:
+            try:
+                with open(self.path, "w") as file:
+                    json.dump(self.entries, file)
+            except OSError as e:
+                print(f"Error saving last known prices: {e}")
+
+    def report(self) -> None:
+        """Print how many prices changed this run"""
+        with self.lock:
+            changes, heartbeats = self.changes, self.heartbeats
+        if changes or heartbeats:
+            print(f"\nPrice changes: {changes} changed, {heartbeats} unchanged "
+                  f"({changes / (changes + heartbeats):.0%} changed)")
+
+
+class ChangeLog:
+    """
+    Change subscriber that appends every event to a JSON lines file.
+
+    Downstream consumers can tail the file instead of diffing the sheet.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, change: PriceChange) -> None:
+        with self.lock:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(change._asdict()) + "\n")
+
+
+_cache: Optional[PriceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache() -> PriceCache:
+    """Return the process-wide PriceCache, loading it on first call"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PriceCache()
+        return _cache
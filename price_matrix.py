@@ -0,0 +1,262 @@
+import os
+from datetime import date
+from typing import List, Optional, Tuple
+import numpy as np
+from price_store import PriceStore
+from product_key import canonical_name
+
+DEFAULT_MATRIX_PATH = "price_matrix.npz"
+
+# Cell values that are not prices
+NO_DATA = -1
+OUT_OF_STOCK = -2
+
+# observed_at of a cell without an observation
+NOT_OBSERVED = -np.inf
+
+
+def column_of(rows: List[Tuple], position: int, dtype) -> np.ndarray:
+    """Parse one comma-separated column of PriceStore.daily_columns() rows into a flat array"""
+    return np.fromstring(",".join(row[position] for row in rows), dtype=dtype, sep=",")
+
+
+class PriceMatrix:
+    """
+    Price history of every platform as one dense product x platform x date array.
+
+    Cells hold integer rupees, OUT_OF_STOCK when the product was listed as
+    unavailable, or NO_DATA when it was not scraped that day. Products from
+    every platform are joined by their canonical name, so the same model
+    lines up across platforms. All reports are computed on whole arrays.
+
+    The full matrix is saved in price_matrix.npz along with the observation
+    time of every cell and the id of the last observation it includes. Later
+    loads read only the observations added to the store since then and fold
+    them in, so loading years of history costs one array read plus the new
+    days.
+    """
+
+    def __init__(self, products: List[str], platforms: List[str], dates: List[str], prices: np.ndarray,
+                 observed: Optional[np.ndarray] = None, last_id: int = 0):
+        self.products = products
+        self.platforms = platforms
+        self.dates = dates
+        self.prices = prices
+        # observed_at of the observation in each cell, NOT_OBSERVED where there is none
+        self.observed = observed if observed is not None else np.where(prices == NO_DATA, NOT_OBSERVED, 0.0)
+        # Highest store id among the observations the matrix was built from
+        self.last_id = last_id
+
+    @classmethod
+    def from_columns(cls, rows: List[Tuple[str, str, int, str, str, str, str, str]]) -> "PriceMatrix":
+        """
+        Build the matrix from PriceStore.daily_columns() rows
+
+        When a product was observed more than once on a day, the latest
+        observation (by observed_at, then id) fills the cell.
+        """
+        if not rows:
+            return cls([], [], [], np.full((0, 0, 0), NO_DATA, dtype=np.int32))
+        ids = column_of(rows, 7, np.int64)
+
+        def column(position: int, dtype) -> np.ndarray:
+            return column_of(rows, position, dtype)
+
+        # Canonicalise each distinct stored name once, then join names that mean the same product
+        canonical = [canonical_name(product) for _, product, *_ in rows]
+        product_names = sorted(set(canonical))
+        platform_names = sorted({row[0] for row in rows})
+        product_codes = {name: code for code, name in enumerate(product_names)}
+        platform_codes = {name: code for code, name in enumerate(platform_names)}
+
+        counts = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        product_index = np.repeat(np.fromiter((product_codes[name] for name in canonical), dtype=np.int64,
+                                              count=len(rows)), counts)
+        platform_index = np.repeat(np.fromiter((platform_codes[row[0]] for row in rows), dtype=np.int64,
+                                               count=len(rows)), counts)
+        # Skip observations whose date could not be parsed
+        observed_days = column(3, np.int64)
+        dated = observed_days >= 0
+        days, date_index = np.unique(observed_days[dated], return_inverse=True)
+        values = column(4, np.int64)[dated]
+        in_stock = column(5, np.int64)[dated]
+        product_index, platform_index = product_index[dated], platform_index[dated]
+
+        # Keep the latest observation of every cell
+        cell = (product_index * len(platform_names) + platform_index) * len(days) + date_index
+        observed_at = column(6, np.float64)[dated]
+        order = np.lexsort((ids[dated], observed_at, cell))
+        ordered_cells = cell[order]
+        latest = order[np.append(ordered_cells[1:] != ordered_cells[:-1], True)]
+
+        cells = np.where(values[latest] < 0, NO_DATA, values[latest]).astype(np.int32)
+        cells[in_stock[latest] == 0] = OUT_OF_STOCK
+        prices = np.full((len(product_names), len(platform_names), len(days)), NO_DATA, dtype=np.int32)
+        prices.reshape(-1)[cell[latest]] = cells
+        observed = np.full(prices.shape, NOT_OBSERVED)
+        observed.reshape(-1)[cell[latest]] = observed_at[latest]
+        return cls(product_names, platform_names, [date.fromordinal(int(day)).isoformat() for day in days], prices,
+                   observed, int(ids.max()))
+
+    @classmethod
+    def from_store(cls, store: PriceStore, start: Optional[str] = None, end: Optional[str] = None,
+                   platforms: Optional[List[str]] = None,
+                   cache_path: Optional[str] = DEFAULT_MATRIX_PATH) -> "PriceMatrix":
+        """
+        Load the price store's history between two dates (YYYY-MM-DD)
+
+        With a cache path, the saved full matrix is brought up to date with the
+        store's new observations, saved again and then sliced; otherwise (and
+        for an in-memory store) the range is read from the store.
+        """
+        if cache_path is None or store.path == ":memory:":
+            return cls.from_columns(store.daily_columns(start, end, platforms))
+
+        matrix = cls.load(cache_path, store.path)
+        last_id = store.last_id()
+        if matrix is None or matrix.last_id > last_id:
+            # No cache yet, or it belongs to another (or a replaced) store
+            matrix = cls.from_columns(store.daily_columns())
+            matrix.save(cache_path, store.path)
+        elif matrix.last_id < last_id:
+            matrix = matrix.merge(cls.from_columns(store.daily_columns(after_id=matrix.last_id)))
+            matrix.save(cache_path, store.path)
+        return matrix.select(start, end, platforms)
+
+    @classmethod
+    def load(cls, path: str, store_path: str) -> Optional["PriceMatrix"]:
+        """Load a saved matrix, or None if there is none for this store"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as state:
+                if str(state["store"]) != os.path.abspath(store_path):
+                    return None
+                return cls([str(name) for name in state["products"]], [str(name) for name in state["platforms"]],
+                           [str(day) for day in state["dates"]], state["prices"], state["observed"],
+                           int(state["last_id"]))
+        except Exception as e:
+            print(f"⚠ Could not load the saved price matrix, rebuilding it: {e}")
+            return None
+
+    def save(self, path: str, store_path: str) -> None:
+        """Save the matrix for the next load; written to a temporary file first, then renamed"""
+        with open(f"{path}.tmp", "wb") as file:
+            np.savez(file, products=np.array(self.products, dtype=str), platforms=np.array(self.platforms, dtype=str),
+                     dates=np.array(self.dates, dtype=str), prices=self.prices, observed=self.observed,
+                     last_id=self.last_id, store=os.path.abspath(store_path))
+        os.replace(f"{path}.tmp", path)
+
+    def merge(self, other: "PriceMatrix") -> "PriceMatrix":
+        """
+        Fold another matrix in, e.g. one built from newer observations
+
+        Each cell keeps the later observation of the two; on equal times the
+        other matrix wins, as its observations were stored later.
+        """
+        products = sorted(set(self.products) | set(other.products))
+        platforms = sorted(set(self.platforms) | set(other.platforms))
+        dates = sorted(set(self.dates) | set(other.dates))
+        shape = (len(products), len(platforms), len(dates))
+        prices = np.full(shape, NO_DATA, dtype=np.int32)
+        observed = np.full(shape, NOT_OBSERVED)
+
+        for matrix in (self, other):
+            region = np.ix_(
+                np.searchsorted(products, matrix.products),
+                np.searchsorted(platforms, matrix.platforms),
+                np.searchsorted(dates, matrix.dates)
+            )
+            newer = matrix.observed >= observed[region]
+            prices[region] = np.where(newer, matrix.prices, prices[region])
+            observed[region] = np.where(newer, matrix.observed, observed[region])
+        return PriceMatrix(products, platforms, dates, prices, observed, max(self.last_id, other.last_id))
+
+    def select(self, start: Optional[str] = None, end: Optional[str] = None,
+               platforms: Optional[List[str]] = None) -> "PriceMatrix":
+        """Return the part between two dates (YYYY-MM-DD), without products, platforms or dates left empty"""
+        wanted = {platform.lower() for platform in platforms} if platforms else None
+        platform_mask = np.array([wanted is None or name in wanted for name in self.platforms], dtype=bool)
+        date_mask = np.array([(start or "") <= day <= (end or "9999-99-99") for day in self.dates], dtype=bool)
+        prices = self.prices[:, platform_mask][:, :, date_mask]
+        observed = self.observed[:, platform_mask][:, :, date_mask]
+
+        has_data = prices != NO_DATA
+        keep_products = has_data.any(axis=(1, 2))
+        keep_platforms = has_data.any(axis=(0, 2))
+        keep_dates = has_data.any(axis=(0, 1))
+        region = np.ix_(keep_products, keep_platforms, keep_dates)
+        platform_names = [name for name, keep in zip(self.platforms, platform_mask) if keep]
+        dates = [day for day, keep in zip(self.dates, date_mask) if keep]
+        return PriceMatrix(
+            [name for name, keep in zip(self.products, keep_products) if keep],
+            [name for name, keep in zip(platform_names, keep_platforms) if keep],
+            [day for day, keep in zip(dates, keep_dates) if keep],
+            prices[region], observed[region], self.last_id
+        )
+
+    def available(self) -> np.ndarray:
+        """Mask of cells with an in-stock price"""
+        return self.prices > 0
+
+    def cheapest(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cheapest platform per product and day
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (platform index, price), both product x date;
+                -1 and NO_DATA where no platform had the product in stock
+        """
+        available = self.available()
+        masked = np.where(available, self.prices, np.iinfo(np.int32).max)
+        platform = masked.argmin(axis=1)
+        price = np.take_along_axis(masked, platform[:, np.newaxis, :], axis=1)[:, 0, :]
+        in_stock_anywhere = available.any(axis=1)
+        return np.where(in_stock_anywhere, platform, -1), np.where(in_stock_anywhere, price, NO_DATA)
+
+    def spread(self) -> np.ndarray:
+        """Highest minus lowest in-stock price per product and day; NO_DATA with fewer than two platforms"""
+        available = self.available()
+        highest = np.where(available, self.prices, np.iinfo(np.int32).min).max(axis=1)
+        lowest = np.where(available, self.prices, np.iinfo(np.int32).max).min(axis=1)
+        return np.where(available.sum(axis=1) >= 2, highest - lowest, NO_DATA)
+
+    def deltas(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Day-over-day price change per product, platform and day
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (change from the previous date, mask of cells where
+                both dates had an in-stock price); the first date never has a change
+        """
+        available = self.available()
+        delta = np.zeros_like(self.prices)
+        delta[:, :, 1:] = self.prices[:, :, 1:] - self.prices[:, :, :-1]
+        valid = np.zeros_like(available)
+        valid[:, :, 1:] = available[:, :, 1:] & available[:, :, :-1]
+        return np.where(valid, delta, 0), valid
+
+    def report(self, date: Optional[str] = None) -> None:
+        """Print the cheapest platform, spread and latest changes of every product on one date"""
+        if not self.dates:
+            print("No prices recorded")
+            return
+        day = self.dates.index(date) if date in self.dates else len(self.dates) - 1
+        platform, price = self.cheapest()
+        spread = self.spread()
+        delta, valid = self.deltas()
+
+        print(f"\nCheapest platform per product on {self.dates[day]}:")
+        for product_index, product in enumerate(self.products):
+            if platform[product_index, day] < 0:
+                print(f"  {product}: not in stock anywhere")
+                continue
+            line = (f"  {product}: ₹{price[product_index, day]} on "
+                    f"{self.platforms[platform[product_index, day]].title()}")
+            if spread[product_index, day] != NO_DATA:
+                line += f", spread ₹{spread[product_index, day]}"
+            changes = [f"{self.platforms[index].title()} {delta[product_index, index, day]:+d}"
+                       for index in np.flatnonzero(valid[product_index, :, day] & (delta[product_index, :, day] != 0))]
+            if changes:
+                line += f", changed: {', '.join(changes)}"
+            print(line)
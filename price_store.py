@@ -0,0 +1,322 @@
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = "prices.db"
+
+
+def parse_price(price: str) -> Tuple[Optional[int], bool]:
+    """
+    Split a scraped price string into a rupee amount and a stock flag
+
+    Args:
+        price (str): Price as scraped, e.g. "64999", "₹64,999" or "Out of Stock"
+
+    Returns:
+        Tuple[Optional[int], bool]: (price in rupees or None, in_stock)
+    """
+    text = str(price).strip()
+    if "out of stock" in text.lower():
+        return None, False
+
+    digits = re.sub(r"[^\d.]", "", text)
+    try:
+        return int(float(digits)), True
+    except ValueError:
+        return None, True
+
+
+class PriceStore:
+    """
+    Local system of record for scraped prices.
+
+    Observations are stored append-only in long format
+    (platform, product, date, price, in_stock) in SQLite, indexed by product and
+    by date. When a product is scraped more than once on the same day the
+    latest observation (by observed_at) wins. An observation is stored once:
+    (platform, product, date, observed_at) is unique, so merging the same
+    shard again adds nothing. Google Sheets is generated from this store.
+
+    The sources table links each configured URL (platform_urls.json key) to
+    the product name its page was last saved under, so per-URL history can
+    be looked up even though the scraped name differs from the config key.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS observations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                platform TEXT NOT NULL,
+                product TEXT NOT NULL,
+                date TEXT NOT NULL,
+                price TEXT NOT NULL,
+                price_value INTEGER,
+                in_stock INTEGER NOT NULL,
+                observed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_observations_product
+                ON observations (platform, product, date);
+            CREATE INDEX IF NOT EXISTS idx_observations_date
+                ON observations (platform, date);
+            CREATE TABLE IF NOT EXISTS sources (
+                platform TEXT NOT NULL,
+                source TEXT NOT NULL,
+                product TEXT NOT NULL,
+                PRIMARY KEY (platform, source)
+            );
+        """)
+        indexed = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_observations_unique'"
+        ).fetchone()
+        if not indexed:
+            # Older stores may hold the same observation twice, e.g. from merging a shard twice
+            self.connection.executescript("""
+                DELETE FROM observations WHERE id NOT IN (
+                    SELECT MIN(id) FROM observations GROUP BY platform, product, date, observed_at
+                );
+                CREATE UNIQUE INDEX idx_observations_unique
+                    ON observations (platform, product, date, observed_at);
+            """)
+        self.connection.commit()
+
+    def add(self, platform: str, product: str, date: str, price: str) -> None:
+        """Append an observation"""
+        self.add_many([(platform, product, date, price)])
+
+    def add_many(self, observations: List[Tuple[str, str, str, str]]) -> None:
+        """Append several (platform, product, date, price) observations in one transaction"""
+        now = time.time()
+        rows = []
+        for platform, product, date, price in observations:
+            price_value, in_stock = parse_price(price)
+            rows.append((platform.lower(), product, date, str(price), price_value, int(in_stock), now))
+
+        with self.lock:
+            # Observations of one batch share a timestamp; the last one for a product and day wins
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO observations "
+                "(platform, product, date, price, price_value, in_stock, observed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.connection.commit()
+
+    def _query(self, sql: str, params: tuple) -> list:
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def get_price(self, platform: str, product: str, date: str) -> Optional[str]:
+        """Return the price recorded for a product on a date, if any"""
+        rows = self._query(
+            "SELECT price FROM observations WHERE platform = ? AND product = ? AND date = ? "
+            "ORDER BY observed_at DESC, id DESC LIMIT 1",
+            (platform.lower(), product, date)
+        )
+        return rows[0][0] if rows else None
+
+    def history(self, platform: str, product: str, start: Optional[str] = None,
+                end: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Return (date, price) pairs for a product, oldest first
+
+        Args:
+            platform (str): Platform name
+            product (str): Formatted product name
+            start (Optional[str]): First date to include (YYYY-MM-DD)
+            end (Optional[str]): Last date to include (YYYY-MM-DD)
+        """
+        # With MAX(), SQLite takes the other columns from the row holding the maximum;
+        # observed_at is unique per product and day, so that row is the latest one
+        rows = self._query(
+            "SELECT date, price, MAX(observed_at) FROM observations"
+            " WHERE platform = ? AND product = ? AND date >= ? AND date <= ?"
+            " GROUP BY date ORDER BY date",
+            (platform.lower(), product, start or "", end or "9999-99-99")
+        )
+        return [(date, price) for date, price, _ in rows]
+
+    def link_source(self, platform: str, source: str, product: str) -> None:
+        """Remember that a configured product's page was saved under a product name"""
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sources (platform, source, product) VALUES (?, ?, ?)",
+                (platform.lower(), source, product)
+            )
+            self.connection.commit()
+
+    def source_products(self, platform: str) -> Dict[str, str]:
+        """Return configured product -> saved product name for a platform"""
+        return dict(self._query("SELECT source, product FROM sources WHERE platform = ?", (platform.lower(),)))
+
+    def last_observed(self, platform: str) -> Dict[str, Tuple[str, float]]:
+        """Return product -> (latest date, time it was observed) for a platform"""
+        rows = self._query(
+            "SELECT product, date, observed_at FROM ("
+            "  SELECT product, date, observed_at,"
+            "    ROW_NUMBER() OVER (PARTITION BY product ORDER BY observed_at DESC, id DESC) AS position"
+            "  FROM observations WHERE platform = ?"
+            ") WHERE position = 1",
+            (platform.lower(),)
+        )
+        return {product: (date, observed_at) for product, date, observed_at in rows}
+
+    def products(self, platform: str) -> List[str]:
+        """Return all products recorded for a platform"""
+        rows = self._query(
+            "SELECT DISTINCT product FROM observations WHERE platform = ? ORDER BY product",
+            (platform.lower(),)
+        )
+        return [row[0] for row in rows]
+
+    def platforms(self) -> List[str]:
+        """Return all platforms with recorded prices"""
+        return [row[0] for row in self._query("SELECT DISTINCT platform FROM observations ORDER BY platform", ())]
+
+    def latest(self, platform: str, start: Optional[str] = None,
+               end: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """Return the latest (product, date, price) per product and day in a date range"""
+        rows = self._query(
+            "SELECT product, date, price, MAX(observed_at) FROM observations"
+            " WHERE platform = ? AND date >= ? AND date <= ?"
+            " GROUP BY product, date ORDER BY product, date",
+            (platform.lower(), start or "", end or "9999-99-99")
+        )
+        return [(product, date, price) for product, date, price, _ in rows]
+
+    def daily_columns(self, start: Optional[str] = None, end: Optional[str] = None,
+                      platforms: Optional[List[str]] = None,
+                      after_id: int = 0) -> List[Tuple[str, str, int, str, str, str, str, str]]:
+        """
+        Return every observation in a date range, packed per platform and product for bulk loading
+
+        Each row is (platform, product, count, days, price_values, in_stock, observed_at, ids),
+        where the last five are comma-separated columns of ``count`` values each. Days are
+        ordinals (date.toordinal()), or -1 for a date that is not YYYY-MM-DD; a missing
+        price_value is -1. Grouping in SQLite keeps the Python work to one row per product
+        instead of one per observation; picking the latest observation per day is left to
+        the caller. ``after_id`` limits the rows to observations stored after that id.
+        """
+        params = [start or "", end or "9999-99-99", after_id]
+        platform_filter = ""
+        if platforms:
+            platform_filter = f" AND platform IN ({', '.join('?' for _ in platforms)})"
+            params.extend(platform.lower() for platform in platforms)
+        # For new observations only, a rowid range beats walking a whole index in GROUP BY order
+        table = "observations NOT INDEXED" if after_id else "observations"
+        return self._query(
+            # julianday() counts from noon, ordinals from midnight of 0001-01-01
+            "SELECT platform, product, COUNT(*),"
+            "  group_concat(IFNULL(CAST(julianday(date) - 1721424.5 AS INTEGER), -1)),"
+            "  group_concat(IFNULL(price_value, -1)), group_concat(in_stock),"
+            "  group_concat(observed_at), group_concat(id)"
+            f" FROM {table} WHERE date >= ? AND date <= ? AND id > ?"
+            f"{platform_filter} GROUP BY platform, product",
+            tuple(params)
+        )
+
+    def last_id(self) -> int:
+        """Return the id of the most recently stored observation, or 0 for an empty store"""
+        return self._query("SELECT IFNULL(MAX(id), 0) FROM observations", ())[0][0]
+
+    def load_grid(self, platform: str) -> Dict[str, Dict[str, str]]:
+        """Return a platform's history in the sheet layout: product -> date -> price"""
+        grid: Dict[str, Dict[str, str]] = {}
+        for product, date, price in self.latest(platform):
+            grid.setdefault(product, {})[date] = price
+        return grid
+
+    def import_grid(self, platform: str, grid: Dict[str, Dict[str, str]]) -> int:
+        """Seed the store from a product -> date -> price grid, e.g. an existing sheet"""
+        observations = [
+            (platform, product, date, price)
+            for product, prices in grid.items()
+            for date, price in prices.items()
+            if price != ""
+        ]
+        self.add_many(observations)
+        return len(observations)
+
+    def merge_from(self, path: str) -> List[Tuple[str, str, str, str]]:
+        """
+        Copy every observation from another store file, e.g. one written by a shard
+
+        Observations the store already holds are skipped, so merging a file
+        twice changes nothing.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: (platform, product, date, price) of every
+                product and day whose latest price now comes from the merged file
+        """
+        other = sqlite3.connect(path)
+        try:
+            rows = other.execute(
+                "SELECT platform, product, date, price, price_value, in_stock, observed_at "
+                "FROM observations ORDER BY observed_at, id"
+            ).fetchall()
+            try:
+                sources = other.execute("SELECT platform, source, product FROM sources").fetchall()
+            except sqlite3.OperationalError:
+                # Written before sources were tracked
+                sources = []
+        finally:
+            other.close()
+
+        merged = {}
+        with self.lock:
+            for row in rows:
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO observations "
+                    "(platform, product, date, price, price_value, in_stock, observed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                if cursor.rowcount:
+                    merged.setdefault(row[:3], set()).add(cursor.lastrowid)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sources (platform, source, product) VALUES (?, ?, ?)",
+                sources
+            )
+            self.connection.commit()
+
+            latest = []
+            for (platform, product, date), ids in merged.items():
+                row_id, price = self.connection.execute(
+                    "SELECT id, price FROM observations WHERE platform = ? AND product = ? AND date = ? "
+                    "ORDER BY observed_at DESC, id DESC LIMIT 1",
+                    (platform, product, date)
+                ).fetchone()
+                # A newer local observation keeps the day's price
+                if row_id in ids:
+                    latest.append((platform, product, date, price))
+        return latest
+
+    def export_to_sheets(self, writer, sheet_name: str, platform: str, start: Optional[str] = None) -> int:
+        """
+        Regenerate a platform's price sheet from the store
+
+        Args:
+            writer: SheetsWriter used to write the cells
+            sheet_name (str): Sheet to write
+            platform (str): Platform name
+            start (Optional[str]): Only export dates from this day on
+
+        Returns:
+            int: Number of cells written, or -1 if the write failed
+        """
+        if not writer.start_rewrite(sheet_name):
+            return -1
+        rows = self.latest(platform, start=start)
+        for product, date, price in rows:
+            writer.add(sheet_name, product, date, price)
+        return len(rows) if writer.flush() else -1
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,98 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Distinct names seen in a run are a few hundred; this bounds memory for long-lived processes
+CACHE_SIZE = 4096
+
+MODEL_PATTERN = re.compile(
+    r"\biphone\s*(\d{1,2}e?|se|xr|xs)(?:\s*(pro\s*max|pro|plus|mini|max))?(?![a-z])",
+    re.IGNORECASE
+)
+
+# Storage size; a size followed by "RAM" is memory ("4 GB RAM / 128 GB")
+STORAGE_PATTERN = re.compile(r"(\d+)\s*(GB|TB)\b(?!\s*RAM)", re.IGNORECASE)
+
+# Legacy clean-up for names that are not recognised as a model
+QUERY_PATTERN = re.compile(r"\?.*|variant=.*")
+BRACKETED_STORAGE_PATTERN = re.compile(r"\s*\((\d+\s*(?:GB|TB))\)", re.IGNORECASE)
+
+TIER_NAMES = {"pro max": "Pro Max", "pro": "Pro", "plus": "Plus", "mini": "mini", "max": "Max"}
+
+
+class ProductKey(NamedTuple):
+    """Canonical identity of a product, independent of platform and title wording"""
+    model: str
+    tier: str
+    storage: Optional[str]
+
+    @property
+    def family(self) -> str:
+        """Model and tier without storage, e.g. "iphone 13 pro max" """
+        return f"iphone {self.model} {self.tier}".strip()
+
+    @property
+    def name(self) -> str:
+        """Display name without brand and storage, e.g. "iPhone 13 Pro Max" """
+        model = self.model.upper() if self.model in ("se", "xr", "xs") else self.model
+        return f"iPhone {model} {TIER_NAMES.get(self.tier, '')}".strip()
+
+    @property
+    def display_name(self) -> str:
+        """Name used in the sheets and the price store, e.g. "Apple iPhone 13 Pro Max (256GB)" """
+        name = f"Apple {self.name}"
+        return f"{name} ({self.storage})" if self.storage else name
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def storage_key(text: Optional[str]) -> Optional[str]:
+    """Normalise a storage size: "128 gb", "(128 GB)" and "128GB" all become "128GB" """
+    if not text:
+        return None
+    match = STORAGE_PATTERN.search(text)
+    return f"{match.group(1)}{match.group(2).upper()}" if match else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def product_key(text: Optional[str]) -> Optional[ProductKey]:
+    """
+    Parse a product name, page title, listing title or config key
+
+    "Apple iPhone 13 Pro Max (256GB) - Sierra Blue", "iphone 13 pro max(256 gb)"
+    and "iPhone 13 Pro Max | 6 GB RAM / 256 GB" all give
+    ProductKey("13", "pro max", "256GB").
+
+    Returns:
+        Optional[ProductKey]: The key, or None if the text names no known model
+    """
+    if not text:
+        return None
+    match = MODEL_PATTERN.search(text)
+    if not match:
+        return None
+    tier = " ".join((match.group(2) or "").lower().split())
+    return ProductKey(match.group(1).lower(), tier, storage_key(text[match.end():]))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_name(product: str) -> str:
+    """
+    Return the name a product is stored under
+
+    Recognised models are named from their key, so every platform's wording
+    of the same product gives the same name. Anything else keeps the
+    previous clean-up: casing fixes, "(128GB)" storage and an "Apple" prefix.
+    """
+    key = product_key(product)
+    if key:
+        return key.display_name
+
+    product = QUERY_PATTERN.sub("", product).strip()
+    product = product.replace('Iphone', 'iPhone').replace('iphone', 'iPhone').replace('Xr', 'XR')
+    storage_match = BRACKETED_STORAGE_PATTERN.search(product)
+    if storage_match:
+        storage = storage_match.group(1).upper().replace(' ', '')
+        product = f"{BRACKETED_STORAGE_PATTERN.sub('', product)} ({storage})"
+    if not product.startswith('Apple'):
+        product = f"Apple {product}"
+    return ' '.join(product.split())
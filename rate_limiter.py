@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+DEFAULT_RATE_LIMITS_PATH = "rate_limits.json"
+
+# Used for domains missing from rate_limits.json
+DEFAULT_LIMITS = {"rate": 0.5, "burst": 2, "max_in_flight": 2}
+
+# Outcomes kept per domain to judge whether errors are spiking
+OUTCOME_WINDOW = 20
+
+# Fraction of failed pages in the window that tightens the limits
+ERROR_SPIKE_RATIO = 0.3
+
+# Consecutive successful pages before the limits are loosened one step
+RECOVER_AFTER = 10
+
+# The rate is never tightened below this fraction of the configured rate
+MIN_RATE_FRACTION = 0.1
+
+
+class DomainLimit:
+    """
+    Token bucket and in-flight cap for one domain, adjusted by outcomes.
+
+    Tokens refill at ``rate`` pages per second up to ``burst``; starting a
+    page takes one token. A bot check, or an error rate above
+    ERROR_SPIKE_RATIO over the last OUTCOME_WINDOW pages, halves the rate and
+    allows one page less in flight. Every RECOVER_AFTER successes in a row
+    win back a quarter of the rate and one in-flight page, up to the
+    configured limits.
+    """
+
+    def __init__(self, rate: float, burst: float, max_in_flight: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.max_in_flight = max(1, max_in_flight)
+        self.in_flight_limit = self.max_in_flight
+        self.in_flight = 0
+        self.recent: deque = deque(maxlen=OUTCOME_WINDOW)
+        self.streak = 0
+        # Outcomes since the last tightening; a spike only tightens once per window
+        self.since_tightened = OUTCOME_WINDOW
+
+        # Counters for reports
+        self.started = 0
+        self.failed = 0
+        self.blocked = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> Optional[float]:
+        """
+        Seconds until a page may start on this domain
+
+        Returns:
+            Optional[float]: 0 if one may start now, or None if it has to wait for a page to finish
+        """
+        if self.in_flight >= self.in_flight_limit:
+            return None
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def start(self, now: float, waited: float) -> None:
+        """Take a token for a page that starts now after ``waited`` seconds in the queue"""
+        self._refill(now)
+        self.tokens -= 1
+        self.in_flight += 1
+        self.started += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def finish(self, failed: bool = False, blocked: bool = False) -> None:
+        """Record how a page ended and adjust the limits"""
+        self.in_flight -= 1
+        self.failed += failed
+        self.blocked += blocked
+        self.recent.append(failed or blocked)
+        self.since_tightened += 1
+
+        if blocked:
+            self._tighten()
+        elif failed:
+            self.streak = 0
+            failures = sum(self.recent)
+            if (len(self.recent) >= OUTCOME_WINDOW // 2 and self.since_tightened >= OUTCOME_WINDOW // 2
+                    and failures / len(self.recent) >= ERROR_SPIKE_RATIO):
+                self._tighten()
+        else:
+            self.streak += 1
+            if self.streak >= RECOVER_AFTER:
+                self.streak = 0
+                self._loosen()
+
+    def _tighten(self) -> None:
+        self.streak = 0
+        self.since_tightened = 0
+        self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+        self.in_flight_limit = max(1, self.in_flight_limit - 1)
+
+    def _loosen(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 4)
+        self.in_flight_limit = min(self.max_in_flight, self.in_flight_limit + 1)
+
+    def mean_wait(self) -> float:
+        return self.wait_total / self.started if self.started else 0.0
+
+
+class RateLimiter:
+    """
+    Per-domain pacing for every page the scrapers fetch.
+
+    Limits come from rate_limits.json, keyed by domain, with a "default"
+    entry for any other site. The limiter keeps no lock of its own; the
+    ScrapeScheduler calls it while holding its condition.
+    """
+
+    def __init__(self, path: str = DEFAULT_RATE_LIMITS_PATH, max_in_flight: Optional[int] = None):
+        self.limits: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    self.limits = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Error loading rate limits: {e}")
+        # --per-domain caps every domain's in-flight pages on top of the config
+        self.max_in_flight = max_in_flight
+        self.domains: Dict[str, DomainLimit] = {}
+
+    def for_domain(self, domain: str) -> DomainLimit:
+        """Return the limit state of a domain, creating it from the config on first use"""
+        if domain not in self.domains:
+            config = {**DEFAULT_LIMITS, **self.limits.get("default", {}), **self.limits.get(domain, {})}
+            max_in_flight = int(config["max_in_flight"])
+            if self.max_in_flight:
+                max_in_flight = min(max_in_flight, self.max_in_flight)
+            self.domains[domain] = DomainLimit(float(config["rate"]), float(config["burst"]), max_in_flight)
+        return self.domains[domain]
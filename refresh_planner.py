@@ -0,0 +1,138 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from page_waits import LatencyStats
+from price_store import PriceStore
+from scheduler import Job
+
+# Days of history used to estimate how often a product's price changes
+HISTORY_DAYS = 90
+
+# A product not refreshed for this many days is always due
+DEFAULT_MAX_AGE_DAYS = 7.0
+
+# Estimated seconds per page when a platform has no recorded latencies
+DEFAULT_PAGE_SECONDS = 8.0
+
+# Added to the page latency for navigation and extraction
+PAGE_OVERHEAD_SECONDS = 2.0
+
+
+def change_rate(history: List[Tuple[str, str]]) -> float:
+    """
+    Estimate how many times per day a product's price changes
+
+    A change is any difference between consecutive observed prices,
+    including going in or out of stock. The estimate is smoothed so a short
+    history with no changes is still treated as possibly volatile.
+
+    Args:
+        history (List[Tuple[str, str]]): (date, price) pairs, oldest first
+
+    Returns:
+        float: Expected changes per day
+    """
+    if not history:
+        return 1.0
+    changes = sum(1 for (_, before), (_, after) in zip(history, history[1:]) if before != after)
+    first = datetime.strptime(history[0][0], "%Y-%m-%d")
+    last = datetime.strptime(history[-1][0], "%Y-%m-%d")
+    days = (last - first).days + 1
+    return (changes + 1) / (days + 1)
+
+
+def change_probability(rate: float, age_days: float) -> float:
+    """Chance that a price changing ``rate`` times a day has changed in ``age_days``"""
+    return 1 - math.exp(-rate * max(0.0, age_days))
+
+
+class RefreshPlanner:
+    """
+    Decide which products a run refreshes, most likely changed first.
+
+    Each configured product's stored history gives its change rate; together
+    with the time since it was last scraped that is the probability its
+    recorded price is stale. Products never scraped, or older than
+    ``max_age_days``, come first. Products are then taken by staleness until
+    the run's page or time budget is spent, so volatile products are
+    refreshed every run and stable ones only once they are likely to have
+    moved.
+    """
+
+    def __init__(self, store: PriceStore, latency_stats: Optional[LatencyStats] = None,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.store = store
+        self.latency_stats = latency_stats
+        self.max_age_days = max_age_days
+        self.sources: Dict[str, Dict[str, str]] = {}
+        self.observed: Dict[str, Dict[str, Tuple[str, float]]] = {}
+
+    def _age_days(self, date: str, observed_at: float, now: float) -> float:
+        # Imported history carries the import time, so the date bounds the age too
+        day_start = time.mktime(datetime.strptime(date, "%Y-%m-%d").timetuple())
+        return (now - min(observed_at, day_start)) / 86400
+
+    def priority(self, job: Job, now: Optional[float] = None) -> float:
+        """
+        Return how urgently a job should be refreshed
+
+        Returns:
+            float: Probability its stored price is stale; above 1 when it is
+                overdue or has never been scraped
+        """
+        platform, source, _ = job
+        now = now or time.time()
+        if platform not in self.sources:
+            self.sources[platform] = self.store.source_products(platform)
+            self.observed[platform] = self.store.last_observed(platform)
+
+        product = self.sources[platform].get(source)
+        if not product or product not in self.observed[platform]:
+            return 2.0
+
+        date, observed_at = self.observed[platform][product]
+        age = self._age_days(date, observed_at, now)
+        if age >= self.max_age_days:
+            return 1.0 + age / self.max_age_days
+
+        start = (datetime.fromtimestamp(now) - timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+        return change_probability(change_rate(self.store.history(platform, product, start=start)), age)
+
+    def page_seconds(self, platform: str) -> float:
+        """Estimated seconds one page of a platform takes"""
+        median = self.latency_stats.percentile(platform, 50) if self.latency_stats else None
+        return (median if median is not None else DEFAULT_PAGE_SECONDS) + PAGE_OVERHEAD_SECONDS
+
+    def plan(self, jobs: List[Job], max_pages: Optional[int] = None, max_minutes: Optional[float] = None,
+             workers: int = 1) -> List[Job]:
+        """
+        Pick the jobs to scrape this run within a budget
+
+        Args:
+            jobs (List[Job]): Every configured (platform, product name, URL)
+            max_pages (Optional[int]): Most pages to load
+            max_minutes (Optional[float]): Estimated run time to stay within
+            workers (int): Browsers scraping in parallel, for the time estimate
+
+        Returns:
+            List[Job]: The chosen jobs, most urgent first
+        """
+        now = time.time()
+        ranked = sorted(((self.priority(job, now), job) for job in jobs), key=lambda item: -item[0])
+
+        chosen = []
+        seconds = 0.0
+        for priority, job in ranked:
+            if max_pages is not None and len(chosen) >= max_pages:
+                break
+            cost = self.page_seconds(job[0]) / max(1, workers)
+            if max_minutes is not None and chosen and seconds + cost > max_minutes * 60:
+                break
+            chosen.append(job)
+            seconds += cost
+
+        skipped = len(jobs) - len(chosen)
+        print(f"Refresh plan: {len(chosen)} of {len(jobs)} pages (~{seconds / 60:.1f} min), "
+              f"{skipped} skipped as least likely to have changed")
+        return chosen
@@ -0,0 +1,212 @@
+import os
+import warnings
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional
+import numpy as np
+from price_matrix import NO_DATA, OUT_OF_STOCK, PriceMatrix
+from price_store import PriceStore
+
+DEFAULT_ROLLING_STATS_PATH = "rolling_stats.npz"
+
+# Days in the rolling window, i.e. "lowest in 90 days"
+WINDOW_DAYS = 90
+
+# Days in the moving average
+AVERAGE_DAYS = 7
+
+# Prices in the window needed before a new low or an outlier is flagged
+MIN_HISTORY = 3
+
+# A price this far from the window's median is treated as mis-scraped,
+# e.g. an EMI or accessory price read from the wrong .a-price element
+OUTLIER_RATIO = 0.5
+
+NEW_LOW = "new_low"
+OUTLIER = "outlier"
+BACK_IN_STOCK = "back_in_stock"
+OUT_OF_STOCK_SIGNAL = "out_of_stock"
+
+
+class PriceSignal(NamedTuple):
+    """One flagged price event"""
+    date: str
+    platform: str
+    product: str
+    kind: str
+    price: Optional[int]
+    reference: Optional[float]
+
+
+class RollingStats:
+    """
+    Rolling price statistics per platform and product, updated a day at a time.
+
+    The last WINDOW_DAYS days of every series are kept in a ring buffer of
+    shape series x WINDOW_DAYS (NaN where there is no in-stock price), so the
+    window minimum, median and moving average of every series come from one
+    array reduction. Each update only advances the window over the days
+    added to the price store since the previous update; the buffer and the
+    last known stock state are saved between runs.
+
+    Flags raised for a day, compared with the window before that day:
+    new 90-day lows, outliers far from the window's median (kept out of the
+    window so a mis-scraped price never becomes the minimum), and products
+    going out of or back in stock.
+    """
+
+    def __init__(self, path: str = DEFAULT_ROLLING_STATS_PATH):
+        self.path = path
+        self.keys: List[str] = []
+        self.window = np.full((0, WINDOW_DAYS), np.nan, dtype=np.float32)
+        self.stock = np.zeros(0, dtype=np.int8)
+        self.previous_stock = np.zeros(0, dtype=np.int8)
+        self.day: Optional[int] = None
+        if os.path.exists(path):
+            try:
+                with np.load(path) as state:
+                    keys = [str(key) for key in state["keys"]]
+                    window, stock, previous_stock = state["window"], state["stock"], state["previous_stock"]
+                    day = int(state["day"])
+                self.keys, self.window, self.stock, self.previous_stock, self.day = (
+                    keys, window, stock, previous_stock, day
+                )
+            except Exception as e:
+                print(f"⚠ Could not load rolling stats, rebuilding them: {e}")
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """Last day the window was advanced to (YYYY-MM-DD)"""
+        return date.fromordinal(self.day).isoformat() if self.day is not None else None
+
+    def _series(self, matrix: PriceMatrix) -> np.ndarray:
+        # Index of each (product, platform) row of the matrix in the buffer; new series are appended
+        positions = {key: index for index, key in enumerate(self.keys)}
+        index = np.empty((len(matrix.products), len(matrix.platforms)), dtype=np.int64)
+        for product_index, product in enumerate(matrix.products):
+            for platform_index, platform in enumerate(matrix.platforms):
+                key = f"{platform}\t{product}"
+                if key not in positions:
+                    positions[key] = len(self.keys)
+                    self.keys.append(key)
+                index[product_index, platform_index] = positions[key]
+
+        added = len(self.keys) - len(self.window)
+        if added:
+            self.window = np.vstack([self.window, np.full((added, WINDOW_DAYS), np.nan, dtype=np.float32)])
+            self.stock = np.concatenate([self.stock, np.zeros(added, dtype=np.int8)])
+            self.previous_stock = np.concatenate([self.previous_stock, np.zeros(added, dtype=np.int8)])
+        return index.ravel()
+
+    def _advance(self, day: int) -> None:
+        # Clear the columns of the days between the last update and this one
+        if self.day is not None and day == self.day:
+            # The same day again: replace its prices and compare with the day before
+            self.window[:, day % WINDOW_DAYS] = np.nan
+            self.stock = self.previous_stock.copy()
+            return
+        start = day - WINDOW_DAYS + 1 if self.day is None else max(self.day + 1, day - WINDOW_DAYS + 1)
+        self.window[:, [d % WINDOW_DAYS for d in range(start, day + 1)]] = np.nan
+        self.previous_stock = self.stock.copy()
+        self.day = day
+
+    def _step(self, day: int, series: np.ndarray, cells: np.ndarray) -> List[tuple]:
+        """Advance to one day and flag its cells; returns (kind, series, price, reference) tuples"""
+        self._advance(day)
+        with warnings.catch_warnings():
+            # Series with no price in the window reduce to NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            window = self.window[series]
+            count = np.count_nonzero(~np.isnan(window), axis=1)
+            lowest = np.nanmin(window, axis=1)
+            median = np.nanmedian(window, axis=1)
+
+        priced = cells > 0
+        seen = cells != NO_DATA
+        established = priced & (count >= MIN_HISTORY)
+        outlier = established & (np.abs(cells - median) > OUTLIER_RATIO * median)
+        new_low = established & ~outlier & (cells < lowest)
+
+        stock = self.stock[series]
+        back_in_stock = seen & priced & (stock == -1)
+        sold_out = seen & (cells == OUT_OF_STOCK) & (stock == 1)
+
+        signals = []
+        for kind, mask, reference in ((OUTLIER, outlier, median), (NEW_LOW, new_low, lowest),
+                                      (BACK_IN_STOCK, back_in_stock, None), (OUT_OF_STOCK_SIGNAL, sold_out, None)):
+            for position in np.flatnonzero(mask):
+                signals.append((kind, series[position], int(cells[position]) if cells[position] > 0 else None,
+                                float(reference[position]) if reference is not None else None))
+
+        keep = priced & ~outlier
+        self.window[series[keep], day % WINDOW_DAYS] = cells[keep]
+        self.stock[series[seen]] = np.where(priced[seen], 1, -1)
+        return signals
+
+    def update(self, store: PriceStore) -> List[PriceSignal]:
+        """
+        Advance the window over the days stored since the last update
+
+        Every platform is updated together, so the saved window stays whole.
+        The last updated day is processed again, so a second run on the same
+        day picks up its new prices. On the first update the window is built
+        from the last WINDOW_DAYS days of history and only the latest day's
+        signals are returned.
+
+        Returns:
+            List[PriceSignal]: Signals of the newly processed days, oldest first
+        """
+        first = self.day is None
+        start = self.last_date or (date.today() - timedelta(days=WINDOW_DAYS)).isoformat()
+        matrix = PriceMatrix.from_store(store, start=start)
+        if not matrix.dates:
+            return []
+
+        series = self._series(matrix)
+        keys = self.keys
+        signals = []
+        for day_index, day_name in enumerate(matrix.dates):
+            day = date.fromisoformat(day_name).toordinal()
+            cells = matrix.prices[:, :, day_index].ravel()
+            step = self._step(day, series, cells)
+            if first and day_index < len(matrix.dates) - 1:
+                continue
+            for kind, position, price, reference in step:
+                platform, product = keys[position].split("\t", 1)
+                signals.append(PriceSignal(day_name, platform, product, kind, price, reference))
+        return signals
+
+    def moving_average(self, days: int = AVERAGE_DAYS) -> np.ndarray:
+        """Mean in-stock price of every series over the last ``days`` days; NaN without prices"""
+        if self.day is None:
+            return np.full(len(self.keys), np.nan)
+        columns = [d % WINDOW_DAYS for d in range(self.day - min(days, WINDOW_DAYS) + 1, self.day + 1)]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmean(self.window[:, columns], axis=1)
+
+    def save(self) -> None:
+        """Persist the window for the next run"""
+        if self.day is None:
+            return
+        np.savez_compressed(self.path, keys=np.array(self.keys), window=self.window, stock=self.stock,
+                            previous_stock=self.previous_stock, day=self.day)
+
+    def report(self, signals: List[PriceSignal]) -> None:
+        """Print signals with the moving average of their series"""
+        if not signals:
+            print("\nNo price signals")
+            return
+        averages = dict(zip(self.keys, self.moving_average()))
+        print("\nPrice signals:")
+        for signal in signals:
+            average = averages.get(f"{signal.platform}\t{signal.product}")
+            trend = f" ({AVERAGE_DAYS}-day avg ₹{average:.0f})" if average is not None and not np.isnan(average) else ""
+            if signal.kind == NEW_LOW:
+                detail = f"lowest in {WINDOW_DAYS} days at ₹{signal.price}, previous low ₹{signal.reference:.0f}"
+            elif signal.kind == OUTLIER:
+                detail = f"⚠ ₹{signal.price} looks mis-scraped, usual price ₹{signal.reference:.0f}"
+            elif signal.kind == BACK_IN_STOCK:
+                detail = f"back in stock at ₹{signal.price}"
+            else:
+                detail = "went out of stock"
+            print(f"  {signal.date} {signal.platform.title()} {signal.product}: {detail}{trend}")
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from rate_limiter import DomainLimit, RateLimiter
+
+# (platform, product name, URL)
+Job = Tuple[str, str, str]
+
+# Cool-down after the first bot check on a domain; doubles with every further one
+BLOCK_COOLDOWN = 60.0
+MAX_BLOCK_COOLDOWN = 900.0
+
+# A URL that hit a bot check this many times is given up on for this run
+MAX_BLOCKED_ATTEMPTS = 3
+
+
+def domain_of(url: str) -> str:
+    """Return the host of a URL without a leading "www." """
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class ScrapeScheduler:
+    """
+    Hand out scrape jobs to workers, interleaving domains.
+
+    Jobs are kept in one queue per domain and handed out round-robin, so
+    concurrent workers spread their load over all sites instead of working
+    through one platform at a time. Every page start is paced by the
+    domain's RateLimiter entry: a domain without a free token, or with its
+    in-flight limit reached, is skipped until it has capacity again. Those
+    limits tighten when a domain returns errors or bot checks.
+
+    A job released as blocked (the site served a bot check) pauses its whole
+    domain for a cool-down that doubles with every consecutive block and goes
+    back to the end of its domain's queue, up to ``max_blocked_attempts``
+    tries. Other domains keep running while one is cooling down.
+    """
+
+    def __init__(self, jobs: Iterable[Job], max_per_domain: Optional[int] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 block_cooldown: float = BLOCK_COOLDOWN, max_block_cooldown: float = MAX_BLOCK_COOLDOWN,
+                 max_blocked_attempts: int = MAX_BLOCKED_ATTEMPTS):
+        self.limiter = limiter or RateLimiter(max_in_flight=max_per_domain)
+        self.block_cooldown = block_cooldown
+        self.max_block_cooldown = max_block_cooldown
+        self.max_blocked_attempts = max_blocked_attempts
+        self.queues: "OrderedDict[str, deque]" = OrderedDict()
+        self.queued_at: Dict[Job, float] = {}
+        self.limits: Dict[str, DomainLimit] = {}
+        # Consecutive blocks, end of the current cool-down and time of the last block per domain
+        self.strikes: Dict[str, int] = {}
+        self.paused_until: Dict[str, float] = {}
+        self.blocked_at: Dict[str, float] = {}
+        self.started: Dict[Job, float] = {}
+        self.blocked_attempts: Dict[Job, int] = {}
+        self.given_up: List[Job] = []
+        self.condition = threading.Condition()
+        self.turn = 0
+        self.cancelled = False
+        self._enqueue(jobs)
+
+    def _enqueue(self, jobs: Iterable[Job]) -> None:
+        now = time.monotonic()
+        for job in jobs:
+            domain = domain_of(job[2])
+            if domain not in self.queues:
+                self.queues[domain] = deque()
+                self.limits[domain] = self.limiter.for_domain(domain)
+                self.strikes[domain] = 0
+                self.paused_until[domain] = 0.0
+                self.blocked_at[domain] = 0.0
+            self.queues[domain].append(job)
+            self.queued_at[job] = now
+
+    def _pick(self) -> Optional[Job]:
+        """Take the next job from the first domain, in turn, that has capacity"""
+        domains = list(self.queues)
+        now = time.monotonic()
+        for offset in range(len(domains)):
+            domain = domains[(self.turn + offset) % len(domains)]
+            if not self.queues[domain] or self.paused_until[domain] > now:
+                continue
+            if self.limits[domain].delay(now) != 0:
+                continue
+            self.turn = (self.turn + offset + 1) % len(domains)
+            job = self.queues[domain].popleft()
+            self.limits[domain].start(now, now - self.queued_at.pop(job, now))
+            self.started[job] = now
+            return job
+        return None
+
+    def _next_ready(self) -> Optional[float]:
+        """
+        Seconds until a domain with queued jobs may start one
+
+        Returns None when every such domain is waiting for a page to finish,
+        since only a release can free it.
+        """
+        now = time.monotonic()
+        waits = []
+        for domain, jobs in self.queues.items():
+            if not jobs:
+                continue
+            delay = self.limits[domain].delay(now)
+            if delay is not None:
+                waits.append(max(delay, self.paused_until[domain] - now))
+        return max(0.0, min(waits)) if waits else None
+
+    def acquire(self) -> Optional[Job]:
+        """
+        Wait for the next job a worker may start
+
+        While the queue is empty but pages are still in flight, keeps waiting:
+        their release may queue a retry or follow-up jobs.
+
+        Returns:
+            Optional[Job]: The job, or None when no jobs are queued or in flight
+        """
+        with self.condition:
+            while True:
+                if self.cancelled:
+                    return None
+                job = self._pick()
+                if job:
+                    return job
+                if not self.pending() and not self.started:
+                    return None
+                self.condition.wait(self._next_ready())
+
+    def release(self, job: Job, blocked: bool = False, failed: bool = False) -> bool:
+        """
+        Mark a job as finished so its domain can take another
+
+        Args:
+            job (Job): The finished job
+            blocked (bool): The site served a bot check instead of the page
+            failed (bool): The page loaded but no price could be scraped
+
+        Returns:
+            bool: True if the blocked job was queued again for a later retry
+        """
+        with self.condition:
+            domain = domain_of(job[2])
+            self.limits[domain].finish(failed=failed, blocked=blocked)
+            started = self.started.pop(job, 0.0)
+            retried = False
+
+            if blocked:
+                # Pages started before the last block are part of the same incident
+                if started >= self.blocked_at[domain]:
+                    self.strikes[domain] += 1
+                    self.blocked_at[domain] = time.monotonic()
+                    cooldown = min(self.max_block_cooldown,
+                                   self.block_cooldown * 2 ** (self.strikes[domain] - 1))
+                    self.paused_until[domain] = self.blocked_at[domain] + cooldown
+                    print(f"⚠ Bot check on {domain}, pausing it for {cooldown:.0f}s")
+
+                attempts = self.blocked_attempts.get(job, 0) + 1
+                self.blocked_attempts[job] = attempts
+                if attempts < self.max_blocked_attempts:
+                    if not self.cancelled:
+                        self.queues[domain].append(job)
+                        self.queued_at[job] = time.monotonic()
+                        retried = True
+                else:
+                    print(f"✗ Giving up on {job[1]} ({job[0]}) after {attempts} bot checks")
+                    self.given_up.append(job)
+            elif started >= self.blocked_at[domain]:
+                self.strikes[domain] = 0
+
+            self.condition.notify_all()
+            return retried
+
+    def add(self, jobs: Iterable[Job]) -> None:
+        """Queue more jobs while the run is in progress"""
+        with self.condition:
+            if not self.cancelled:
+                self._enqueue(jobs)
+            self.condition.notify_all()
+
+    def pending(self) -> int:
+        """Number of jobs not yet handed out"""
+        return sum(len(jobs) for jobs in self.queues.values())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Live pacing state per domain
+
+        Returns:
+            Dict[str, Dict[str, float]]: Per domain: queued and in-flight pages, the
+                current rate (pages/s) and in-flight limit, pages started, failed and
+                blocked, and the mean and max seconds a page waited in the queue
+        """
+        with self.condition:
+            now = time.monotonic()
+            stats = {}
+            for domain, limit in self.limits.items():
+                # Jobs still queued count towards the wait time they have accumulated so far
+                waiting = [now - self.queued_at[job] for job in self.queues[domain] if job in self.queued_at]
+                stats[domain] = {
+                    "queued": len(self.queues[domain]),
+                    "in_flight": limit.in_flight,
+                    "rate": round(limit.rate, 3),
+                    "in_flight_limit": limit.in_flight_limit,
+                    "started": limit.started,
+                    "failed": limit.failed,
+                    "blocked": limit.blocked,
+                    "mean_wait": round(limit.mean_wait(), 1),
+                    "max_wait": round(max([limit.wait_max] + waiting), 1),
+                }
+            return stats
+
+    def report(self) -> None:
+        """Print the pacing state of every domain"""
+        for domain, stats in self.stats().items():
+            print(f"  {domain}: {stats['queued']} queued, {stats['in_flight']}/{stats['in_flight_limit']} in flight, "
+                  f"{stats['rate']:.2f} pages/s, {stats['started']} started "
+                  f"({stats['failed']} failed, {stats['blocked']} blocked), "
+                  f"wait {stats['mean_wait']:.1f}s mean / {stats['max_wait']:.1f}s max")
+
+    def cancel(self) -> None:
+        """Drop all jobs that have not been started yet"""
+        with self.condition:
+            self.cancelled = True
+            for jobs in self.queues.values():
+                jobs.clear()
+            self.condition.notify_all()
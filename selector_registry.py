@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SELECTORS_PATH = "selectors.json"
+DEFAULT_SELECTOR_STATS_PATH = "selector_stats.json"
+
+# A selector that never matched in this many attempts is reported as dead
+DEAD_AFTER_ATTEMPTS = 20
+
+# Roles that mark a condition only some pages have (out of stock, a bot check, ...).
+# Their selectors miss on every other page, so a miss says nothing about the selector.
+MARKER_ROLES = {"buy_now", "notify_me", "out_of_stock", "bot_wall"}
+
+
+class SelectorRegistry:
+    """
+    Per-platform CSS selectors loaded from selectors.json, with dead ones tried last.
+
+    Selectors are grouped by role ("title", "price", "out_of_stock", ...) and
+    listed from most to least specific, e.g. the selling price before any
+    price on the page, so the declared order is the ranking. Every lookup
+    records a hit or miss and the lookup time for the selector in
+    selector_stats.json. A selector that has not matched once in
+    DEAD_AFTER_ATTEMPTS tries, typically after a markup change, drops to the
+    back instead of being paid for on every page. Marker roles are never
+    demoted or reported, since their selectors only match on some pages.
+    """
+
+    def __init__(self, path: str = DEFAULT_SELECTORS_PATH, stats_path: str = DEFAULT_SELECTOR_STATS_PATH):
+        self.path = path
+        self.stats_path = stats_path
+        self.lock = threading.Lock()
+        with open(path, "r") as file:
+            self.selectors: Dict[str, Dict[str, List[str]]] = json.load(file)
+
+        # platform -> role -> selector -> {"hits", "misses", "seconds"}
+        self.stats: Dict[str, Dict[str, Dict[str, Dict[str, float]]]] = {}
+        if os.path.exists(stats_path):
+            try:
+                with open(stats_path, "r") as file:
+                    self.stats = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Error loading selector stats: {e}")
+
+    def _entry(self, platform: str, role: str, selector: str) -> Dict[str, float]:
+        return (self.stats.setdefault(platform.lower(), {})
+                .setdefault(role, {})
+                .setdefault(selector, {"hits": 0, "misses": 0, "seconds": 0.0}))
+
+    def _is_dead(self, platform: str, role: str, selector: str, min_attempts: int) -> bool:
+        if role in MARKER_ROLES:
+            return False
+        entry = self.stats.get(platform, {}).get(role, {}).get(selector)
+        return bool(entry) and entry["hits"] == 0 and entry["misses"] >= min_attempts
+
+    def ordered(self, platform: str, role: str) -> List[str]:
+        """Return a role's selectors in declared order, dead selectors last"""
+        platform = platform.lower()
+        declared = self.selectors.get(platform, {}).get(role, [])
+        with self.lock:
+            # sorted() is stable, so live and dead selectors each keep their declared order
+            return sorted(declared, key=lambda selector: self._is_dead(platform, role, selector,
+                                                                       DEAD_AFTER_ATTEMPTS))
+
+    def group(self, platform: str, role: str) -> str:
+        """Return a role's selectors as one comma-separated CSS selector"""
+        return ", ".join(self.ordered(platform, role))
+
+    def record(self, platform: str, role: str, selector: str, hit: bool, seconds: float) -> None:
+        """Record the result of one selector lookup"""
+        with self.lock:
+            entry = self._entry(platform, role, selector)
+            entry["hits" if hit else "misses"] += 1
+            entry["seconds"] += seconds
+
+    def dead_selectors(self, min_attempts: int = DEAD_AFTER_ATTEMPTS) -> List[Tuple[str, str, str, int]]:
+        """
+        Return selectors that never matched, leaving out marker roles
+
+        Returns:
+            List[Tuple[str, str, str, int]]: (platform, role, selector, attempts)
+        """
+        dead = []
+        with self.lock:
+            for platform, roles in self.selectors.items():
+                for role, selectors in roles.items():
+                    for selector in selectors:
+                        if self._is_dead(platform, role, selector, min_attempts):
+                            misses = self.stats[platform][role][selector]["misses"]
+                            dead.append((platform, role, selector, int(misses)))
+        return dead
+
+    def report(self) -> None:
+        """Print selectors that look dead"""
+        for platform, role, selector, attempts in self.dead_selectors():
+            print(f"⚠ {platform} {role} selector '{selector}' has not matched in {attempts} attempts")
+
+    def save(self) -> None:
+        """Write the selector stats to disk"""
+        with self.lock:
+            try:
+                with open(self.stats_path, "w") as file:
+                    json.dump(self.stats, file, indent=2)
+            except OSError as e:
+                print(f"Error saving selector stats: {e}")
+
+
+_registry: Optional[SelectorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_selector_registry() -> SelectorRegistry:
+    """Return the process-wide SelectorRegistry, loading it on first call"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry()
+        return _registry
@@ -0,0 +1,45 @@
+import hashlib
+from typing import Iterable, List, Tuple
+from scheduler import Job
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a "--shard i/N" value
+
+    Args:
+        value (str): Shard spec such as "2/4" (1-based)
+
+    Returns:
+        Tuple[int, int]: (shard index, shard count)
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {max(count, 1)}")
+    return index, count
+
+
+def _weight(key: str, shard: int) -> int:
+    digest = hashlib.sha1(f"{key}#{shard}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def shard_for(platform: str, product_name: str, shard_count: int) -> int:
+    """
+    Return the 1-based shard that owns a product
+
+    Uses rendezvous hashing: every shard scores the (platform, product) key and
+    the highest score wins. The result only depends on the key and the shard
+    count, and going from N to N+1 shards only moves the products the new
+    shard wins, about 1/(N+1) of the catalog.
+    """
+    key = f"{platform.lower()}:{' '.join(product_name.lower().split())}"
+    return max(range(1, shard_count + 1), key=lambda shard: _weight(key, shard))
+
+
+def filter_jobs(jobs: Iterable[Job], index: int, count: int) -> List[Job]:
+    """Keep the jobs owned by shard ``index`` of ``count``"""
+    return [job for job in jobs if shard_for(job[0], job[1], count) == index]
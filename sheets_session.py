@@ -0,0 +1,121 @@
+import os
+import threading
+from typing import Dict, List, Optional
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+from sheets_writer import RequestThrottle
+
+# If modifying these scopes, delete the file token.json.
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+SPREADSHEET_ID = "1dIIM6lmDfX0HhK5L5TFWnThr3TWzBAJ1kmP30632_9k"  # Your shared spreadsheet ID
+
+
+class SheetsSession:
+    """
+    Process-wide Google Sheets connection, created on first use.
+
+    Credentials are loaded (or refreshed) once and the service is built from
+    the discovery document bundled with google-api-python-client, so no
+    discovery request is made. Sheet titles and properties are fetched once
+    and only refreshed when this session creates new sheets.
+    """
+
+    def __init__(self, spreadsheet_id: str = SPREADSHEET_ID,
+                 token_path: str = "token.json", credentials_path: str = "credentials.json"):
+        self.spreadsheet_id = spreadsheet_id
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.throttle = RequestThrottle()
+        self.lock = threading.Lock()
+        self._spreadsheets = None
+        self._sheet_properties: Optional[Dict[str, dict]] = None
+
+    def _load_credentials(self) -> Credentials:
+        """Load the saved token, refreshing it or running the OAuth flow if needed"""
+        creds = None
+        if os.path.exists(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.credentials_path, SCOPES
+                )
+                creds = flow.run_local_server(port=8080)
+            with open(self.token_path, "w") as token:
+                token.write(creds.to_json())
+        return creds
+
+    @property
+    def spreadsheets(self):
+        """The spreadsheets() resource, built on first access"""
+        with self.lock:
+            if self._spreadsheets is None:
+                service = build(
+                    "sheets", "v4",
+                    credentials=self._load_credentials(),
+                    static_discovery=True,
+                    cache_discovery=False
+                )
+                self._spreadsheets = service.spreadsheets()
+            return self._spreadsheets
+
+    def execute(self, request):
+        """Execute a Sheets request under the shared quota throttle"""
+        self.throttle.wait()
+        return request.execute()
+
+    def sheet_properties(self) -> Dict[str, dict]:
+        """Return sheet title -> properties, fetching the metadata only once"""
+        if self._sheet_properties is None:
+            spreadsheet = self.execute(self.spreadsheets.get(
+                spreadsheetId=self.spreadsheet_id,
+                fields="sheets.properties"
+            ))
+            self._sheet_properties = {
+                sheet['properties']['title']: sheet['properties']
+                for sheet in spreadsheet.get('sheets', [])
+            }
+        return self._sheet_properties
+
+    def ensure_sheets(self, sheet_names: List[str]) -> List[str]:
+        """
+        Create all missing sheets in a single batch request
+
+        Returns:
+            List[str]: Names of the sheets that were created
+        """
+        properties = self.sheet_properties()
+        missing = sorted({name for name in sheet_names if name not in properties})
+        if not missing:
+            return []
+
+        body = {'requests': [{'addSheet': {'properties': {'title': name}}} for name in missing]}
+        response = self.execute(self.spreadsheets.batchUpdate(spreadsheetId=self.spreadsheet_id, body=body))
+        for reply in response.get('replies', []):
+            sheet = reply['addSheet']['properties']
+            properties[sheet['title']] = sheet
+            print(f"Created new sheet: {sheet['title']}")
+        return missing
+
+    def invalidate(self) -> None:
+        """Forget cached sheet metadata, e.g. after a failed write"""
+        self._sheet_properties = None
+
+
+_session: Optional[SheetsSession] = None
+_session_lock = threading.Lock()
+
+
+def get_sheets_session(spreadsheet_id: str = SPREADSHEET_ID) -> SheetsSession:
+    """Return the process-wide SheetsSession, creating it on first call"""
+    global _session
+    with _session_lock:
+        if _session is None or _session.spreadsheet_id != spreadsheet_id:
+            _session = SheetsSession(spreadsheet_id)
+        return _session
@@ -0,0 +1,454 @@
+import re
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from googleapiclient.errors import HttpError
+
+# Google Sheets allows 60 read and 60 write requests per minute per user.
+# Stay a little below that so other tools sharing the token keep working.
+DEFAULT_REQUESTS_PER_MINUTE = 50
+
+# Rows fetched per read request, so request size stays flat as history grows
+READ_PAGE_ROWS = 500
+
+# "wide": one row per product and one column per date ({platform}_prices)
+# "long": append-only rows of (date, product, price) ({platform}_history)
+WIDE_LAYOUT = "wide"
+LONG_LAYOUT = "long"
+LONG_HEADER = ["Date", "Product", "Price"]
+
+
+class RequestThrottle:
+    """Sliding-window limiter that keeps Sheets API calls under the per-minute quota"""
+
+    def __init__(self, max_requests: int = DEFAULT_REQUESTS_PER_MINUTE, window: float = 60.0):
+        self.max_requests = max_requests
+        self.window = window
+        self.calls = deque()
+
+    def wait(self) -> None:
+        """Block until another request fits in the current window"""
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] >= self.window:
+            self.calls.popleft()
+
+        if len(self.calls) >= self.max_requests:
+            delay = self.window - (now - self.calls[0])
+            if delay > 0:
+                print(f"Sheets quota reached, waiting {delay:.1f}s...")
+                time.sleep(delay)
+            self.calls.popleft()
+
+        self.calls.append(time.monotonic())
+
+
+def iter_sheet_rows(sheets_service, spreadsheet_id: str, sheet_name: Optional[str],
+                    page_rows: int = READ_PAGE_ROWS, throttle: Optional[RequestThrottle] = None):
+    """
+    Yield the rows of a sheet in bounded pages instead of one fixed range
+
+    Args:
+        sheets_service: Spreadsheets resource of the Sheets API
+        spreadsheet_id (str): Spreadsheet to read
+        sheet_name (Optional[str]): Sheet to read, or None for the first sheet
+        page_rows (int): Number of rows fetched per request
+
+    Yields:
+        List[str]: One row of cell values
+    """
+    prefix = f"{sheet_name}!" if sheet_name else ""
+    start = 1
+    while True:
+        end = start + page_rows - 1
+        if throttle:
+            throttle.wait()
+        result = sheets_service.values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"{prefix}{start}:{end}"
+        ).execute()
+        page = result.get('values', [])
+        yield from page
+        if len(page) < page_rows:
+            return
+        start = end + 1
+
+
+def column_letter(index: int) -> str:
+    """Convert a 1-based column index to its A1 letter (1 -> A, 27 -> AA)"""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+class SheetIndex:
+    """Local map of product -> row and date -> column for one price sheet"""
+
+    def __init__(self, column_a: List[List[str]], header_row: List[List[str]],
+                 format_product_name: Callable[[str], str]):
+        headers = header_row[0] if header_row else []
+        # Row 1 is the header, so the first product lives in row 2
+        self.rows: Dict[str, int] = {}
+        for row_number, row in enumerate(column_a[1:], 2):
+            if row and row[0]:
+                self.rows.setdefault(format_product_name(row[0]), row_number)
+        self.columns: Dict[str, int] = {
+            date: column for column, date in enumerate(headers[1:], 2) if date
+        }
+        self.has_header = bool(headers)
+        self.row_count = max(len(column_a), 1)
+        self.column_count = max(len(headers), 1)
+
+    def cell(self, product: str, date: str) -> str:
+        """Return the A1 address of a product/date cell"""
+        return f"{column_letter(self.columns[date])}{self.rows[product]}"
+
+
+class SheetsWriter:
+    """
+    Collect price observations in memory and write them to Google Sheets in batches.
+
+    Every observation of a run is buffered per platform sheet. On the first flush
+    the writer reads only column A and row 1 of each touched sheet to build a
+    SheetIndex, then every flush sends exactly the changed cells (plus any new
+    date columns) in one ``values.batchUpdate``. Upload volume scales with the
+    number of changed cells rather than with the sheet's history.
+
+    New products are added with ``values.append``, which lets Sheets choose the
+    rows, so writers running at the same time never share a row. The header
+    row is read again before new date columns are added; two writers adding
+    the same new date at the same moment can still both create a column.
+    """
+
+    def __init__(self, session,
+                 format_product_name: Optional[Callable[[str], str]] = None,
+                 flush_every: Optional[int] = None,
+                 layout: str = WIDE_LAYOUT,
+                 page_rows: int = READ_PAGE_ROWS):
+        self.session = session
+        self.format_product_name = format_product_name or (lambda name: name)
+        self.flush_every = flush_every
+        self.layout = layout
+        self.page_rows = page_rows
+        # sheet name -> product -> date -> price
+        self.pending: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.pending_count = 0
+        # Built once per run, kept up to date as rows and columns are appended
+        self.indexes: Dict[str, SheetIndex] = {}
+        # Long-layout sheets known to start with LONG_HEADER
+        self.headed = set()
+
+    def add(self, sheet_name: str, product: str, date: str, price: str) -> None:
+        """Buffer a single observation, flushing if the flush interval is reached"""
+        self.pending.setdefault(sheet_name, {}).setdefault(product, {})[date] = str(price)
+        self.pending_count += 1
+
+        if self.flush_every and self.pending_count >= self.flush_every:
+            self.flush()
+
+    @property
+    def sheets_service(self):
+        return self.session.spreadsheets
+
+    @property
+    def spreadsheet_id(self) -> str:
+        return self.session.spreadsheet_id
+
+    def _execute(self, request):
+        """Execute a Sheets request under the session's quota throttle"""
+        return self.session.execute(request)
+
+    def _ensure_sheets_exist(self, sheet_names: List[str]) -> None:
+        """Create all missing sheets in a single batch request"""
+        self.session.ensure_sheets(sheet_names)
+
+    def _ensure_long_headers(self, sheet_names: List[str]) -> None:
+        """
+        Make sure every long-layout sheet starts with LONG_HEADER
+
+        Row 1 is read rather than trusting who created the sheet, since sheets
+        are also created up front by the session. A sheet whose first row holds
+        data gets the header inserted above it.
+        """
+        unchecked = [name for name in sheet_names if name not in self.headed]
+        if not unchecked:
+            return
+
+        result = self._execute(self.sheets_service.values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[f"{name}!A1:C1" for name in unchecked]
+        ))
+        missing = []
+        for name, value_range in zip(unchecked, result.get('valueRanges', [])):
+            first_row = (value_range.get('values') or [[]])[0]
+            if first_row[:3] != LONG_HEADER:
+                missing.append((name, bool(first_row)))
+
+        inserts = [
+            {'insertDimension': {
+                'range': {'sheetId': self.session.sheet_properties()[name]['sheetId'],
+                          'dimension': "ROWS", 'startIndex': 0, 'endIndex': 1},
+                'inheritFromBefore': False
+            }}
+            for name, has_data in missing if has_data
+        ]
+        if inserts:
+            self._execute(self.sheets_service.batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'requests': inserts}
+            ))
+        if missing:
+            self._execute(self.sheets_service.values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'valueInputOption': 'RAW',
+                      'data': [{'range': f"{name}!A1:C1", 'values': [LONG_HEADER]} for name, _ in missing]}
+            ))
+        self.headed.update(unchecked)
+
+    def _load_indexes(self, sheet_names: List[str]) -> List[str]:
+        """
+        Read the header row and, page by page, column A of every unindexed sheet
+
+        Returns:
+            List[str]: The sheets that were indexed
+        """
+        unindexed = [name for name in sheet_names if name not in self.indexes]
+        if not unindexed:
+            return []
+
+        result = self._execute(self.sheets_service.values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[f"{name}!1:1" for name in unindexed]
+        ))
+        header_rows = [value_range.get('values', []) for value_range in result.get('valueRanges', [])]
+
+        # Page through column A of all sheets together, one request per page
+        column_a = {name: [] for name in unindexed}
+        remaining = list(unindexed)
+        start = 1
+        while remaining:
+            end = start + self.page_rows - 1
+            result = self._execute(self.sheets_service.values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{name}!A{start}:A{end}" for name in remaining]
+            ))
+            still_remaining = []
+            for name, value_range in zip(remaining, result.get('valueRanges', [])):
+                page = value_range.get('values', [])
+                column_a[name].extend(page)
+                if len(page) == self.page_rows:
+                    still_remaining.append(name)
+            remaining = still_remaining
+            start = end + 1
+
+        for name, header_row in zip(unindexed, header_rows):
+            self.indexes[name] = SheetIndex(column_a[name], header_row, self.format_product_name)
+        return unindexed
+
+    def _refresh_columns(self, sheet_names: List[str]) -> None:
+        """Re-read the header row of sheets that get new dates, picking up columns other writers added"""
+        stale = [
+            name for name in sheet_names
+            if any(date not in self.indexes[name].columns for prices in self.pending[name].values() for date in prices)
+        ]
+        if not stale:
+            return
+
+        result = self._execute(self.sheets_service.values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[f"{name}!1:1" for name in stale]
+        ))
+        for name, value_range in zip(stale, result.get('valueRanges', [])):
+            index = self.indexes[name]
+            headers = (value_range.get('values') or [[]])[0]
+            for column, date in enumerate(headers[1:], 2):
+                if date:
+                    index.columns.setdefault(date, column)
+            index.column_count = max(index.column_count, len(headers))
+
+    def _append_products(self, sheet_names: List[str]) -> None:
+        """Add a row for every new product with values.append and record the rows Sheets chose"""
+        for name in sheet_names:
+            index = self.indexes[name]
+            products = [product for product in self.pending[name] if product not in index.rows]
+            if not products:
+                continue
+
+            rows = [[product] for product in products]
+            if not index.has_header:
+                rows.insert(0, ["Product"])
+            result = self._execute(self.sheets_service.values().append(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{name}!A:A",
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={'values': rows}
+            ))
+
+            # e.g. "'cashify_prices'!A118:A120"
+            first_row = int(re.search(r"![A-Z]+(\d+)", result['updates']['updatedRange']).group(1))
+            if not index.has_header:
+                first_row += 1
+                index.has_header = True
+            for row_number, product in enumerate(products, first_row):
+                index.rows[product] = row_number
+            index.row_count = max(index.row_count, first_row + len(products) - 1)
+
+            # INSERT_ROWS grew the grid by the appended rows
+            grid = self.session.sheet_properties()[name].setdefault('gridProperties', {})
+            grid['rowCount'] = grid.get('rowCount', 0) + len(rows)
+
+    def _plan_cells(self, sheet_name: str, updates: Dict[str, Dict[str, str]]) -> List[dict]:
+        """Allocate columns for new dates and list the cells to write; products already have rows"""
+        index = self.indexes[sheet_name]
+        data = []
+
+        new_dates = sorted({
+            date for prices in updates.values() for date in prices
+            if date not in index.columns
+        })
+        for date in new_dates:
+            index.column_count += 1
+            index.columns[date] = index.column_count
+            data.append({'range': f"{sheet_name}!{column_letter(index.column_count)}1", 'values': [[date]]})
+
+        for product, prices in updates.items():
+            for date, price in prices.items():
+                data.append({'range': f"{sheet_name}!{index.cell(product, date)}", 'values': [[price]]})
+
+        return data
+
+    def _ensure_grid_size(self, sheet_names: List[str]) -> None:
+        """Grow sheet grids in one request when new rows or columns no longer fit"""
+        requests = []
+        for name in sheet_names:
+            properties = self.session.sheet_properties()[name]
+            grid = properties.setdefault('gridProperties', {})
+            index = self.indexes[name]
+
+            for dimension, needed, key in (("ROWS", index.row_count, 'rowCount'),
+                                           ("COLUMNS", index.column_count, 'columnCount')):
+                available = grid.get(key, 0)
+                if needed > available:
+                    requests.append({'appendDimension': {
+                        'sheetId': properties['sheetId'],
+                        'dimension': dimension,
+                        'length': needed - available
+                    }})
+                    grid[key] = needed
+
+        if requests:
+            self._execute(self.sheets_service.batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'requests': requests}
+            ))
+
+    def flush(self) -> bool:
+        """
+        Write all buffered observations to Google Sheets
+
+        Returns:
+            bool: True if the buffer was written (or empty), False on API error
+        """
+        if not self.pending:
+            return True
+
+        sheet_names = sorted(self.pending)
+        if self.layout == LONG_LAYOUT:
+            return self._append_long(sheet_names)
+
+        try:
+            self._ensure_sheets_exist(sheet_names)
+            indexed = self._load_indexes(sheet_names)
+            self._refresh_columns([name for name in sheet_names if name not in indexed])
+            self._append_products(sheet_names)
+
+            data = []
+            for name in sheet_names:
+                data.extend(self._plan_cells(name, self.pending[name]))
+
+            self._ensure_grid_size(sheet_names)
+            self._execute(self.sheets_service.values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': data}
+            ))
+
+        except Exception as error:
+            # Not only HttpError: connection resets, timeouts and auth transport errors too
+            print(f"✗ Error writing {self.pending_count} buffered prices to Google Sheets: {error}")
+            # Columns may have been allocated but not written; rebuild on retry
+            for name in sheet_names:
+                self.indexes.pop(name, None)
+            self.session.invalidate()
+            return False
+
+        for name in sheet_names:
+            print(f"✓ Updated {len(self.pending[name])} products in {name}")
+        self.pending = {}
+        self.pending_count = 0
+        return True
+
+    def start_rewrite(self, sheet_name: str) -> bool:
+        """
+        Prepare a sheet to be regenerated in full
+
+        Wide cells are overwritten in place. Long-layout rows are only ever
+        appended, so the sheet is cleared first and gets a new header on the
+        next flush.
+
+        Returns:
+            bool: True if the sheet is ready, False on API error
+        """
+        if self.layout != LONG_LAYOUT:
+            return True
+        try:
+            self._ensure_sheets_exist([sheet_name])
+            self._execute(self.sheets_service.values().clear(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{sheet_name}!A:C",
+                body={}
+            ))
+        except HttpError as error:
+            print(f"✗ Error clearing {sheet_name}: {error}")
+            return False
+        self.headed.discard(sheet_name)
+        return True
+
+    def _append_long(self, sheet_names: List[str]) -> bool:
+        """
+        Append buffered observations as (date, product, price) rows
+
+        Sheets are appended one at a time. On error, the sheets already
+        appended are removed from ``pending`` so callers retry only the rest.
+        """
+        try:
+            self._ensure_sheets_exist(sheet_names)
+            self._ensure_long_headers(sheet_names)
+
+            for name in sheet_names:
+                rows = [
+                    [date, product, price]
+                    for product, prices in sorted(self.pending[name].items())
+                    for date, price in sorted(prices.items())
+                ]
+
+                # values.append grows the grid itself, so there is no row ceiling
+                self._execute(self.sheets_service.values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{name}!A:C",
+                    valueInputOption="RAW",
+                    insertDataOption="INSERT_ROWS",
+                    body={'values': rows}
+                ))
+                print(f"✓ Appended {len(rows)} rows to {name}")
+                del self.pending[name]
+
+        except Exception as error:
+            print(f"✗ Error appending buffered prices to Google Sheets: {error}")
+            self.pending_count = sum(len(prices) for updates in self.pending.values() for prices in updates.values())
+            return False
+
+        self.pending = {}
+        self.pending_count = 0
+        return True
@@ -0,0 +1,45 @@
+import os
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Run every test from the repository root, where the JSON configuration lives"""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def site(tmp_path):
+    """
+    Local stand-in for a shop: files written under ``site.root`` are served over HTTP
+
+    Yields an object with ``root`` (a Path) and ``url(path)``.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(tmp_path)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    class Site:
+        root = tmp_path
+
+        @staticmethod
+        def url(path: str) -> str:
+            return f"http://127.0.0.1:{server.server_port}/{path.lstrip('/')}"
+
+    try:
+        yield Site
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,108 @@
+import json
+import pytest
+from cashify_scraper import CashifyScraper
+from controlz_scraper import ControlzScraper
+
+TITLE = '<h3 class="h3 line-clamp-2">Apple iPhone 13 - Refurbished</h3>'
+VARIANT = '<div class="body2 mb-2 text-surface-text">4 GB RAM / 128 GB, Midnight</div>'
+PRICE = '<span class="h1" itemprop="price" content="30999">₹30,999</span>'
+BUY_NOW = '<h2 class="h2">Buy Now</h2>'
+NOTIFY_ME = '<span class="text-primary-text-contrast text-md">Notify Me</span>'
+RECOMMENDATION = '<div class="card"><span itemprop="price" content="12499">₹12,499</span></div>'
+
+
+def json_ld(price: str, availability: str = "https://schema.org/InStock") -> str:
+    document = {"@context": "https://schema.org", "@type": "Product", "name": "Apple iPhone 13",
+                "offers": {"@type": "Offer", "price": price, "priceCurrency": "INR", "availability": availability}}
+    return f'<script type="application/ld+json">{json.dumps(document)}</script>'
+
+
+def scraper(cls):
+    # No browser, no Sheets and a throwaway store
+    return cls(None, store_path=":memory:", queue_path=":memory:", sync_sheets=False)
+
+
+@pytest.fixture
+def cashify_page(site):
+    def serve(*parts: str) -> str:
+        path = site.root / "apple-iphone-13" / "99850.html"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"<html><body>{''.join(parts)}</body></html>", encoding="utf-8")
+        return site.url("apple-iphone-13/99850.html")
+    return serve
+
+
+@pytest.fixture
+def shopify_product(site):
+    def serve(variants) -> str:
+        path = site.root / "products" / "iphone-13.js"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps({"title": "Apple iPhone 13", "variants": variants}))
+        return site.url("products/iphone-13")
+    return serve
+
+
+def test_cashify_microdata_price(cashify_page):
+    url = cashify_page(TITLE, VARIANT, PRICE, BUY_NOW)
+    assert scraper(CashifyScraper).extract_fast(url) == ("iPhone 13 (128GB)", "30999")
+
+
+def test_cashify_ignores_recommendation_prices(cashify_page):
+    url = cashify_page(RECOMMENDATION, TITLE, VARIANT, PRICE, BUY_NOW)
+    assert scraper(CashifyScraper).extract_fast(url) == ("iPhone 13 (128GB)", "30999")
+
+
+def test_cashify_notify_me_is_out_of_stock(cashify_page):
+    url = cashify_page(TITLE, VARIANT, PRICE, NOTIFY_ME)
+    assert scraper(CashifyScraper).extract_fast(url) == ("iPhone 13 (128GB)", "Out of Stock")
+
+
+def test_cashify_json_ld_price(cashify_page):
+    url = cashify_page(TITLE, VARIANT, json_ld("30999.00"), BUY_NOW)
+    assert scraper(CashifyScraper).extract_fast(url) == ("iPhone 13 (128GB)", "30999")
+
+
+def test_cashify_json_ld_out_of_stock(cashify_page):
+    url = cashify_page(TITLE, VARIANT, json_ld("30999", "https://schema.org/OutOfStock"))
+    assert scraper(CashifyScraper).extract_fast(url) == ("iPhone 13 (128GB)", "Out of Stock")
+
+
+@pytest.mark.parametrize("parts", [
+    (VARIANT, PRICE, BUY_NOW),          # no title
+    (TITLE, PRICE, BUY_NOW),            # no variant line: the name would come from the URL
+    (TITLE, VARIANT, BUY_NOW),          # no price
+    (TITLE, VARIANT, RECOMMENDATION),   # only another product's price
+])
+def test_cashify_falls_back_to_browser(cashify_page, parts):
+    assert scraper(CashifyScraper).extract_fast(cashify_page(*parts)) is None
+
+
+def test_cashify_falls_back_when_page_is_missing(site):
+    assert scraper(CashifyScraper).extract_fast(site.url("missing.html")) is None
+
+
+def test_controlz_first_available_variant(shopify_product):
+    url = shopify_product([
+        {"option1": "128 GB", "price": 3499900, "available": False},
+        {"option1": "256 GB", "price": 3999900, "available": True},
+    ])
+    assert scraper(ControlzScraper).extract_fast(url) == ("Apple iPhone 13 (256 GB)", "39999")
+
+
+def test_controlz_variants_from_json(shopify_product):
+    url = shopify_product([
+        {"option1": "128 GB", "price": 3499900, "available": False},
+        {"option1": "256 GB", "price": 3999900, "available": True},
+    ])
+    found = scraper(ControlzScraper).fetch_variants(url, {"128GB", "256GB"})
+    assert found["128GB"] == ("Apple iPhone 13 (128 GB)", "Out of Stock")
+    assert found["256GB"] == found[None] == ("Apple iPhone 13 (256 GB)", "39999")
+
+
+def test_controlz_falls_back_when_sold_out(shopify_product):
+    url = shopify_product([{"option1": "128 GB", "price": 3499900, "available": False}])
+    assert scraper(ControlzScraper).extract_fast(url) is None
+
+
+def test_controlz_falls_back_without_product_json(site):
+    assert scraper(ControlzScraper).extract_fast(site.url("products/unknown")) is None
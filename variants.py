@@ -0,0 +1,64 @@
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from product_key import product_key, storage_key
+from scheduler import Job
+
+# Storage suffix of a configured name, e.g. "(128 GB)"
+STORAGE_SUFFIX_PATTERN = re.compile(r"\(?\s*(\d+)\s*(GB|TB)\s*\)?", re.IGNORECASE)
+
+# Clicks the variant option whose text names the wanted storage, in one
+# round-trip. The storage is normalised the same way as storage_key().
+VARIANT_CLICK_SCRIPT = """
+const [selector, wanted] = arguments;
+for (const element of document.querySelectorAll(selector)) {
+    const match = element.textContent.match(/(\\d+)\\s*(GB|TB)\\b(?!\\s*RAM)/i);
+    if (match && match[1] + match[2].toUpperCase() === wanted) {
+        element.scrollIntoView({block: 'center'});
+        element.click();
+        return true;
+    }
+}
+return false;
+"""
+
+
+def split_variant(name: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a configured product name into its model family and storage
+
+    "iphone 13 pro(256 gb)" -> ("iphone 13 pro", "256GB")
+    """
+    key = product_key(name)
+    if key:
+        return key.family, key.storage
+    family = " ".join(STORAGE_SUFFIX_PATTERN.sub(" ", name).lower().split())
+    return family, storage_key(name)
+
+
+def group_families(jobs: Iterable[Job], platforms: Iterable[str]) -> Tuple[List[Job], Dict[Job, List[Job]]]:
+    """
+    Group the jobs of one model family so one page load serves all its variants
+
+    Only jobs of the given platforms are grouped; families with a single job
+    stay ordinary jobs.
+
+    Returns:
+        Tuple[List[Job], Dict[Job, List[Job]]]: (jobs to schedule, representative job -> every job of its family)
+    """
+    platforms = {platform.lower() for platform in platforms}
+    groups: "OrderedDict[Tuple[str, str], List[Job]]" = OrderedDict()
+    singles = []
+    for job in jobs:
+        if job[0].lower() in platforms:
+            groups.setdefault((job[0].lower(), split_variant(job[1])[0]), []).append(job)
+        else:
+            singles.append(job)
+
+    scheduled = list(singles)
+    families = {}
+    for members in groups.values():
+        scheduled.append(members[0])
+        if len(members) > 1:
+            families[members[0]] = members
+    return scheduled, families